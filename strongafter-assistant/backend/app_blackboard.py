@@ -36,8 +36,10 @@ from blackboard import (
     ExcerptRetrievalAgent,
     SummaryGenerationAgent,
     QualityAssuranceAgent,
-    StreamingAgent
+    StreamingAgent,
+    SemanticResponseCache
 )
+from blackboard.knowledge_sources import EXCERPT_PREVIEW_CHARS, GEMINI_EXECUTOR
 from blackboard.local_llm_agent import LocalLLMAgent, LocalLLMConfig
 
 
@@ -48,6 +50,14 @@ load_dotenv(verbose=True)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Use uvloop for the per-request event loops when it is available
+try:
+    import uvloop
+    uvloop.install()
+    logger.info("Using uvloop event loop")
+except ImportError:
+    pass
+
 # Import existing utilities
 from utils.markdown_parser import parse_markdown_sections
 
@@ -83,6 +93,11 @@ def load_themes_and_metadata() -> tuple[list[dict], dict]:
         theme_label = theme['label']
         if theme_label in retrievals:
             theme['excerpts'] = retrievals[theme_label]['similar_excerpts']
+
+            # Truncate excerpt text once for summary prompts instead of per request
+            for item in theme['excerpts']:
+                excerpt = item['excerpt']
+                excerpt['text_preview'] = excerpt['text'][:EXCERPT_PREVIEW_CHARS]
         else:
             logger.warning(f"No retrievals found for theme {theme_label}")
             theme['excerpts'] = []
@@ -118,6 +133,9 @@ class BlackboardTherapyService:
         # Create blackboard
         self.blackboard = TherapyBlackboard()
 
+        # Semantic cache lets similar queries skip theme analysis and summary generation
+        self.response_cache = SemanticResponseCache(embed_fn=self._embed_text)
+
         # Initialize local LLM agent
         local_llm_config = LocalLLMConfig(
             host="localhost",
@@ -130,12 +148,17 @@ class BlackboardTherapyService:
         # Create agents
         self.agents = {
             'local_llm': LocalLLMAgent(self.blackboard, local_llm_config),
-            'theme_analysis': ThemeAnalysisAgent(self.blackboard, self.gemini_model),
+            'theme_analysis': ThemeAnalysisAgent(
+                self.blackboard,
+                self.gemini_model,
+                self.response_cache
+            ),
             'excerpt_retrieval': ExcerptRetrievalAgent(self.blackboard),
             'summary_generation': SummaryGenerationAgent(
                 self.blackboard,
                 self.gemini_model,
-                self.book_metadata
+                self.book_metadata,
+                self.response_cache
             ),
             'quality_assurance': QualityAssuranceAgent(self.blackboard),
             'streaming': StreamingAgent(self.blackboard)
@@ -150,6 +173,12 @@ class BlackboardTherapyService:
 
         logger.info("Blackboard system initialized successfully")
 
+    @staticmethod
+    def _embed_text(text: str) -> list:
+        """Embed user text with Gemini for semantic cache lookups"""
+        result = genai.embed_content(model='models/text-embedding-004', content=text)
+        return result['embedding']
+
     async def process_text_async(self, text: str) -> Dict[str, Any]:
         """
         Process text using the blackboard system
@@ -195,15 +224,32 @@ class BlackboardTherapyService:
         Returns:
             Processing results
         """
+        return self.run_in_new_loop(self.process_text_async(text))
+
+    def run_in_new_loop(self, coro) -> Any:
+        """
+        Run a coroutine on a fresh event loop, closing the loop's Ollama session afterwards
+
+        The session cannot outlive its loop, so Ollama connections are only
+        kept alive for the duration of one request.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
         # Create new event loop for this request
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
         try:
-            result = loop.run_until_complete(self.process_text_async(text))
-            return result
+            return loop.run_until_complete(coro)
         finally:
-            loop.close()
+            try:
+                loop.run_until_complete(self.agents['local_llm'].aclose())
+            finally:
+                loop.close()
 
     def get_system_status(self) -> Dict[str, Any]:
         """Get status of the blackboard system"""
@@ -218,6 +264,7 @@ class BlackboardTherapyService:
             'blackboard_state': self.blackboard.get_state_summary() if self.blackboard else None,
             'agents': agent_status,
             'control_strategy_metrics': self.control_strategy.get_metrics() if self.control_strategy else None,
+            'response_cache': self.response_cache.metrics,
             'themes_loaded': len(self.themes_data),
             'metadata_sources': len(self.book_metadata)
         }
@@ -232,7 +279,10 @@ class BlackboardTherapyService:
 
         # Check Gemini API
         try:
-            test_response = self.gemini_model.generate_content("Test")
+            loop = asyncio.get_running_loop()
+            test_response = await loop.run_in_executor(
+                GEMINI_EXECUTOR, self.gemini_model.generate_content, "Test"
+            )
             health_status['components']['gemini'] = {
                 'status': 'healthy',
                 'response_time': 0.5  # Placeholder
@@ -285,13 +335,7 @@ def health_check():
     """Health check endpoint with comprehensive system status"""
     try:
         # Run async health check
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            health_status = loop.run_until_complete(therapy_service.health_check_async())
-        finally:
-            loop.close()
+        health_status = therapy_service.run_in_new_loop(therapy_service.health_check_async())
 
         return jsonify(health_status)
 
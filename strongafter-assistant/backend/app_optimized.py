@@ -36,7 +36,7 @@ logger = logging.getLogger(__name__)
 
 # Load quality configuration for adaptive processing modes
 # Contains timeout settings, confidence thresholds, and safety terms
-with open('quality.yml', 'r') as f:
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quality.yml'), 'r') as f:
     CONFIG = yaml.safe_load(f)
 
 # Configure Google Gemini API for citation generation
@@ -13,6 +13,7 @@ coordinating multiple specialized AI agents in therapeutic content processing.
 """
 from .blackboard import TherapyBlackboard
 from .control_strategy import BlackboardControlStrategy
+from .semantic_cache import SemanticResponseCache
 from .knowledge_sources import (
     ThemeAnalysisAgent,
     ExcerptRetrievalAgent,
@@ -24,6 +25,7 @@ from .knowledge_sources import (
 __all__ = [
     'TherapyBlackboard',
     'BlackboardControlStrategy',
+    'SemanticResponseCache',
     'ThemeAnalysisAgent',
     'ExcerptRetrievalAgent',
     'SummaryGenerationAgent',
@@ -25,6 +25,7 @@ class AgentCapabilities:
     estimated_processing_time: float = 1.0  # seconds
     confidence_threshold: float = 0.7
     fallback_available: bool = False
+    prerequisite_timeout: float = 5.0  # seconds to wait for prerequisites to be written
 
 
 class BaseAgent(ABC):
@@ -121,13 +122,21 @@ class BaseAgent(ABC):
         self.is_running = True
         result = {'success': False, 'agent': self.name}
 
+        # Let consumers wait for our outputs only while we are running
+        self.blackboard.expect(self.name, self.get_outputs())
+
         try:
             logger.info(f"Starting agent: {self.name}")
 
-            # Check prerequisites
+            # Wait for prerequisites that a running agent has yet to write
+            missing = [key for key in self.get_prerequisites() if not self.blackboard.is_written(key)]
+            if missing:
+                await self.blackboard.wait_for(missing, timeout=self.capabilities.prerequisite_timeout)
+
             if not self.can_contribute():
                 result.update({
                     'success': False,
+                    'skipped': True,
                     'error': 'Prerequisites not met',
                     'prerequisites': self.get_prerequisites()
                 })
@@ -176,6 +185,7 @@ class BaseAgent(ABC):
             })
 
         finally:
+            self.blackboard.settle(self.name, self.get_outputs())
             self.is_running = False
             self.last_execution_time = time.time()
             self.execution_count += 1
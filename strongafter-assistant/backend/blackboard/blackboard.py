@@ -17,10 +17,13 @@ requests while maintaining data integrity and processing coordination.
 import asyncio
 import logging
 import time
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import threading
+from collections import deque
+
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +40,45 @@ class BlackboardEntry:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+def _initial_structure() -> Dict[str, Any]:
+    """Expected blackboard keys with fresh default values"""
+    return {
+        'user_input': None,
+        'preprocessed_text': None,
+        'user_intent': None,
+        'theme_candidates': [],
+        'theme_scores': {},
+        'selected_themes': [],
+        'retrieved_excerpts': {},
+        'excerpt_summaries': {},
+        'partial_summaries': {},
+        'citations': [],
+        'final_response': None,
+        'quality_score': None,
+        'confidence_scores': {},
+        'processing_status': {
+            'theme_analysis': 'pending',
+            'excerpt_retrieval': 'pending',
+            'summary_generation': 'pending',
+            'quality_assurance': 'pending'
+        },
+        'streaming_updates': [],
+        'error_messages': [],
+        'fallback_triggered': False
+    }
+
+
+# Keys present on every blackboard, used to pre-size the data dict
+INITIAL_KEYS = tuple(_initial_structure())
+
+# dtype of the 'theme_scores_arr' array (0-100 scores aligned with
+# theme_candidates), written by every theme analysis agent
+THEME_SCORES_DTYPE = np.float64
+
+# Maximum number of streaming updates buffered for the streaming agent
+STREAMING_BUFFER_SIZE = 1024
+
+
 class TherapyBlackboard:
     """
     Central blackboard for therapy processing system.
@@ -45,11 +87,37 @@ class TherapyBlackboard:
     and provides thread-safe access to data.
     """
 
+    __slots__ = (
+        '_data',
+        '_subscribers',
+        '_subscriber_tasks',
+        '_written',
+        '_producers',
+        '_waiters',
+        '_lock',
+        'processing_start_time',
+        'metrics',
+        'updates_deque',
+        'updates_seq'
+    )
+
     def __init__(self):
-        self._data: Dict[str, BlackboardEntry] = {}
+        self._data: Dict[str, BlackboardEntry] = dict.fromkeys(INITIAL_KEYS)
         self._subscribers: Dict[str, List[Callable]] = {}
+        self._subscriber_tasks: Set[asyncio.Task] = set()
+        # Keys written since the last clear, the running agents expected to
+        # write each key, and the events of coroutines waiting for keys along
+        # with the loop each event belongs to
+        self._written: Set[str] = set()
+        self._producers: Dict[str, Set[str]] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
         self._lock = threading.RLock()
         self.processing_start_time = None
+
+        # Pending streaming updates and a sequence number that only ever grows,
+        # so consumers can detect new updates without scanning the full list
+        self.updates_deque: deque = deque(maxlen=STREAMING_BUFFER_SIZE)
+        self.updates_seq = 0
         self.metrics = {
             'total_writes': 0,
             'total_reads': 0,
@@ -62,32 +130,7 @@ class TherapyBlackboard:
 
     def _initialize_structure(self):
         """Initialize blackboard with expected data structure"""
-        initial_data = {
-            'user_input': None,
-            'preprocessed_text': None,
-            'user_intent': None,
-            'theme_candidates': [],
-            'theme_scores': {},
-            'selected_themes': [],
-            'retrieved_excerpts': {},
-            'excerpt_summaries': {},
-            'partial_summaries': {},
-            'citations': [],
-            'final_response': None,
-            'quality_score': None,
-            'confidence_scores': {},
-            'processing_status': {
-                'theme_analysis': 'pending',
-                'excerpt_retrieval': 'pending',
-                'summary_generation': 'pending',
-                'quality_assurance': 'pending'
-            },
-            'streaming_updates': [],
-            'error_messages': [],
-            'fallback_triggered': False
-        }
-
-        for key, value in initial_data.items():
+        for key, value in _initial_structure().items():
             self._data[key] = BlackboardEntry(
                 key=key,
                 value=value,
@@ -127,8 +170,53 @@ class TherapyBlackboard:
             # Log significant writes
             logger.info(f"Blackboard write: {key} by {source} (confidence: {confidence})")
 
-            # Notify subscribers
-            self._notify_subscribers(key, entry)
+            # Capture waiters and subscribers so they can be notified outside the lock
+            waiters = self._mark_written(key)
+            callbacks = tuple(self._subscribers.get(key, ()))
+
+        self._wake_waiters(waiters)
+
+        # Notify subscribers without holding the lock so a slow callback
+        # cannot stall other writers
+        if callbacks:
+            self._notify_subscribers(key, entry, callbacks)
+
+    def write_many(self, values: Dict[str, Any], source: str, confidence: float = 1.0) -> None:
+        """
+        Write several values to the blackboard under a single lock acquisition
+
+        Args:
+            values: Mapping of data keys to values
+            source: Source agent/system writing the data
+            confidence: Confidence level (0.0 - 1.0) applied to every entry
+        """
+        notifications = []
+        waiters = []
+        with self._lock:
+            for key, value in values.items():
+                entry = BlackboardEntry(
+                    key=key,
+                    value=value,
+                    source=source,
+                    confidence=confidence
+                )
+                self._data[key] = entry
+                waiters.extend(self._mark_written(key))
+
+                callbacks = self._subscribers.get(key)
+                if callbacks:
+                    notifications.append((key, entry, tuple(callbacks)))
+
+            self.metrics['total_writes'] += len(values)
+            contributions = self.metrics['agent_contributions']
+            contributions[source] = contributions.get(source, 0) + len(values)
+
+            logger.info(f"Blackboard bulk write: {len(values)} keys by {source} (confidence: {confidence})")
+
+        self._wake_waiters(waiters)
+
+        for key, entry, callbacks in notifications:
+            self._notify_subscribers(key, entry, callbacks)
 
     def read(self, key: str) -> Any:
         """
@@ -145,6 +233,21 @@ class TherapyBlackboard:
             entry = self._data.get(key)
             return entry.value if entry else None
 
+    def snapshot(self, keys: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        Read several values from the blackboard under a single lock acquisition
+
+        Args:
+            keys: The data keys to read
+
+        Returns:
+            Dictionary mapping each key to its value, or None if not found
+        """
+        with self._lock:
+            self.metrics['total_reads'] += len(keys)
+            data = self._data
+            return {key: (entry.value if (entry := data.get(key)) else None) for key in keys}
+
     def read_entry(self, key: str) -> Optional[BlackboardEntry]:
         """
         Read full entry including metadata from the blackboard
@@ -164,6 +267,11 @@ class TherapyBlackboard:
             entry = self._data.get(key)
             return entry is not None and entry.value is not None
 
+    def is_written(self, key: str) -> bool:
+        """Check if the key has been written since the last clear, ignoring initial placeholders"""
+        with self._lock:
+            return key in self._written
+
     def is_ready_for(self, operation: str) -> bool:
         """
         Check if prerequisites are available for a given operation
@@ -185,6 +293,109 @@ class TherapyBlackboard:
         required = prerequisites.get(operation, [])
         return all(self.has_data(key) for key in required)
 
+    def expect(self, producer: str, keys: List[str]) -> None:
+        """
+        Announce that a producer is about to write the given keys
+
+        Args:
+            producer: Name of the agent that will write the keys
+            keys: The data keys it produces
+        """
+        with self._lock:
+            for key in keys:
+                self._producers.setdefault(key, set()).add(producer)
+
+    def settle(self, producer: str, keys: List[str]) -> None:
+        """
+        Record that a producer has finished, whether or not it wrote its keys
+
+        Waiters on keys that are still unwritten and have no producer left
+        are woken so they can give up instead of waiting out their timeout.
+
+        Args:
+            producer: Name of the agent that finished
+            keys: The data keys it was expected to produce
+        """
+        waiters = []
+        with self._lock:
+            for key in keys:
+                producers = self._producers.get(key)
+                if producers is None:
+                    continue
+                producers.discard(producer)
+                if not producers:
+                    del self._producers[key]
+                    waiters.extend(self._waiters.pop(key, []))
+        self._wake_waiters(waiters)
+
+    async def wait_for(self, keys: List[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every key has been written since the last clear
+
+        Only keys that a running producer announced with expect() are waited
+        for; a missing key with no producer left ends the wait at once.
+
+        Args:
+            keys: The data keys to wait for
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if all keys were written, False if one can no longer be
+            written or on timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        event = asyncio.Event()
+        registered = set()
+
+        try:
+            while True:
+                with self._lock:
+                    missing = [key for key in keys if key not in self._written]
+                    if not missing:
+                        return True
+                    if any(key not in self._producers for key in missing):
+                        return False
+
+                    # Register again for keys whose waiters were popped by a write or settle
+                    event.clear()
+                    for key in missing:
+                        waiters = self._waiters.setdefault(key, [])
+                        if (loop, event) not in waiters:
+                            waiters.append((loop, event))
+                            registered.add(key)
+
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return False
+        finally:
+            with self._lock:
+                for key in registered:
+                    waiters = self._waiters.get(key)
+                    if waiters and (loop, event) in waiters:
+                        waiters.remove((loop, event))
+
+    def _mark_written(self, key: str) -> List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]:
+        """Record a write to a key, returning the waiters to wake (lock must be held)"""
+        self._written.add(key)
+        return self._waiters.pop(key, [])
+
+    @staticmethod
+    def _wake_waiters(waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]) -> None:
+        """
+        Set waiter events on their own loops
+
+        asyncio.Event is not thread-safe and writers may run on another thread,
+        so events are set through call_soon_threadsafe.
+        """
+        for loop, event in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
     def subscribe(self, key: str, callback: Callable[[BlackboardEntry], None]) -> None:
         """
         Subscribe to changes for a specific key
@@ -198,14 +409,30 @@ class TherapyBlackboard:
                 self._subscribers[key] = []
             self._subscribers[key].append(callback)
 
-    def _notify_subscribers(self, key: str, entry: BlackboardEntry) -> None:
-        """Notify subscribers of changes"""
-        if key in self._subscribers:
-            for callback in self._subscribers[key]:
-                try:
+    def _notify_subscribers(self, key: str, entry: BlackboardEntry,
+                            callbacks: Tuple[Callable, ...]) -> None:
+        """
+        Notify subscribers of changes
+
+        Coroutine callbacks are scheduled as tasks on the running event loop
+        instead of being awaited, so the writer never blocks on them.
+        """
+        for callback in callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    loop = asyncio.get_running_loop()
+                    loop.call_soon_threadsafe(self._schedule_subscriber, loop, callback, entry)
+                else:
                     callback(entry)
-                except Exception as e:
-                    logger.error(f"Error in subscriber callback for {key}: {e}")
+            except Exception as e:
+                logger.error(f"Error in subscriber callback for {key}: {e}")
+
+    def _schedule_subscriber(self, loop: asyncio.AbstractEventLoop, callback: Callable,
+                             entry: BlackboardEntry) -> None:
+        """Run an async subscriber as a task, keeping a reference until it finishes"""
+        task = loop.create_task(callback(entry))
+        self._subscriber_tasks.add(task)
+        task.add_done_callback(self._subscriber_tasks.discard)
 
     def get_processing_status(self) -> Dict[str, str]:
         """Get current processing status"""
@@ -228,12 +455,27 @@ class TherapyBlackboard:
 
     def add_streaming_update(self, update: Dict[str, Any], source: str) -> None:
         """Add a streaming update for real-time user feedback"""
-        updates = self.read('streaming_updates') or []
-        update['timestamp'] = datetime.now().isoformat()
-        update['source'] = source
-        updates.append(update)
+        with self._lock:
+            updates = self.read('streaming_updates') or []
+            update['timestamp'] = datetime.now().isoformat()
+            update['source'] = source
+            updates.append(update)
+            self.updates_deque.append(update)
+            self.updates_seq += 1
         self.write('streaming_updates', updates, source)
 
+    def drain_streaming_updates(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Remove and return all pending streaming updates
+
+        Returns:
+            Tuple of the pending updates and the current update sequence number
+        """
+        with self._lock:
+            pending = list(self.updates_deque)
+            self.updates_deque.clear()
+            return pending, self.updates_seq
+
     def add_error(self, error_message: str, source: str, severity: str = 'error') -> None:
         """Add an error message to the blackboard"""
         errors = self.read('error_messages') or []
@@ -276,6 +518,10 @@ class TherapyBlackboard:
         """Clear the blackboard (for testing)"""
         with self._lock:
             self._initialize_structure()
+            self._written.clear()
+            self._producers.clear()
+            # updates_seq is left untouched so consumers never see it go backwards
+            self.updates_deque.clear()
             self.processing_start_time = None
             self.metrics = {
                 'total_writes': 0,
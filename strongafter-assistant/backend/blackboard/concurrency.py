@@ -0,0 +1,89 @@
+"""
+Process-wide Concurrency Limits for Blackboard Agents
+
+Each request runs on its own event loop in its own Flask thread, so an
+asyncio.Semaphore only bounds the calls of a single request. The limiter
+here is shared by every event loop in the process, so a cap on model
+calls holds however many requests run at once.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Tuple
+
+
+class ProcessSemaphore:
+    """
+    Counting semaphore usable from any event loop in the process.
+
+    Waiters are queued first come, first served and woken on their own loop,
+    so no thread blocks while waiting for a slot.
+    """
+
+    def __init__(self, value: int):
+        """
+        Initialize the semaphore
+
+        Args:
+            value: Number of slots that can be held at once
+        """
+        if value < 1:
+            raise ValueError("ProcessSemaphore value must be at least 1")
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def locked(self) -> bool:
+        """Whether acquire() would have to wait"""
+        with self._lock:
+            return self._value == 0
+
+    async def acquire(self) -> None:
+        """Wait for a free slot and take it"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    # release() already handed this waiter the slot
+                    granted = True
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it straight to the oldest waiter if any"""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_grant, future)
+                    return
+                except RuntimeError:
+                    # The waiter's loop has closed, so it will never take the slot
+                    continue
+            self._value += 1
+
+
+def _grant(future: asyncio.Future) -> None:
+    """Wake a waiter on its own loop"""
+    if not future.done():
+        future.set_result(None)
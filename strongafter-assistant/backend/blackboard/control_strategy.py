@@ -59,6 +59,15 @@ class BlackboardControlStrategy:
     - Fault tolerance with fallback strategies
     """
 
+    # Blackboard keys read when compiling the final results
+    FINAL_RESULT_KEYS = (
+        'final_response',
+        'selected_themes',
+        'quality_score',
+        'processing_status',
+        'streaming_updates'
+    )
+
     def __init__(self, blackboard: TherapyBlackboard, agents: List[BaseAgent], themes_data: Optional[List[Dict]] = None):
         """
         Initialize the control strategy
@@ -71,6 +80,13 @@ class BlackboardControlStrategy:
         self.blackboard = blackboard
         self.agents = {agent.name: agent for agent in agents}
         self.themes_data = themes_data or []
+
+        # Agent set is fixed, so pairwise parallel compatibility is computed once
+        agent_list = list(self.agents.values())
+        self._compat = [
+            [agent.can_run_parallel_with(other) for other in agent_list]
+            for agent in agent_list
+        ]
         self.execution_history = []
         self.max_iterations = 20
         self.default_timeout = 60.0
@@ -250,21 +266,22 @@ class BlackboardControlStrategy:
     def _find_parallel_groups(self) -> List[List[BaseAgent]]:
         """Find groups of agents that can run in parallel"""
         agents = list(self.agents.values())
+        compat = self._compat
         groups = []
 
         # Simple greedy algorithm to group compatible agents
-        remaining_agents = agents.copy()
+        remaining = list(range(len(agents)))
 
-        while remaining_agents:
-            current_group = [remaining_agents.pop(0)]
+        while remaining:
+            current_group = [remaining.pop(0)]
 
             # Find agents compatible with current group
-            for agent in remaining_agents.copy():
-                if all(agent.can_run_parallel_with(group_member) for group_member in current_group):
-                    current_group.append(agent)
-                    remaining_agents.remove(agent)
+            for idx in remaining.copy():
+                if all(compat[idx][member] for member in current_group):
+                    current_group.append(idx)
+                    remaining.remove(idx)
 
-            groups.append(current_group)
+            groups.append([agents[idx] for idx in current_group])
 
         return groups
 
@@ -311,71 +328,84 @@ class BlackboardControlStrategy:
 
     async def _execute_parallel_group(self, agents: List[BaseAgent]) -> List[Dict[str, Any]]:
         """Execute a group of agents in parallel"""
-        # Filter agents that can actually contribute
-        ready_agents = [agent for agent in agents if agent.can_contribute()]
-
-        if not ready_agents:
-            logger.warning("No agents ready to contribute in parallel group")
+        if not agents:
             return []
 
-        # Create tasks for parallel execution
-        tasks = [agent.execute() for agent in ready_agents]
+        # Announce the group's outputs before any agent starts, so a consumer
+        # scheduled ahead of its producer waits for it instead of giving up
+        for agent in agents:
+            self.blackboard.expect(agent.name, agent.get_outputs())
+
+        # Start every agent at once; each waits for its own prerequisites, so
+        # agents consuming another member's outputs wake up when they are written
+        tasks = [asyncio.create_task(agent.execute()) for agent in agents]
+
+        # Execute with timeout, cancelling any agent still running afterwards
+        done, pending = await asyncio.wait(tasks, timeout=self.default_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.error(f"Parallel group execution timed out after {self.default_timeout}s, "
+                         f"cancelled {len(pending)} agents")
+
+        # Agents cancelled before they started never settle their own outputs
+        for agent in agents:
+            self.blackboard.settle(agent.name, agent.get_outputs())
+
+        processed_results = []
+        for agent, task in zip(agents, tasks):
+            if task in pending:
+                processed_results.append({
+                    'success': False,
+                    'agent': agent.name,
+                    'error': 'Timeout'
+                })
+            elif task.exception() is not None:
+                logger.error(f"Agent {agent.name} failed with exception: {task.exception()}")
+                processed_results.append({
+                    'success': False,
+                    'agent': agent.name,
+                    'error': str(task.exception())
+                })
+            elif task.result().get('skipped'):
+                logger.info(f"Agent {agent.name} not ready to contribute, skipping")
+            else:
+                processed_results.append(task.result())
 
-        try:
-            # Execute with timeout
-            results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=self.default_timeout
-            )
-
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Agent {ready_agents[i].name} failed with exception: {result}")
-                    processed_results.append({
-                        'success': False,
-                        'agent': ready_agents[i].name,
-                        'error': str(result)
-                    })
-                else:
-                    processed_results.append(result)
-
-            return processed_results
-
-        except asyncio.TimeoutError:
-            logger.error(f"Parallel group execution timed out after {self.default_timeout}s")
-            return [{'success': False, 'error': 'Timeout'} for _ in ready_agents]
+        return processed_results
 
     async def _execute_sequential_phase(self, agents: List[BaseAgent]) -> List[Dict[str, Any]]:
         """Execute agents sequentially within a phase"""
         results = []
 
         for agent in agents:
-            if agent.can_contribute():
-                try:
-                    result = await asyncio.wait_for(agent.execute(), timeout=self.default_timeout)
-                    results.append(result)
-
-                    # Check if we should stop early
-                    if not result.get('success', False):
-                        logger.warning(f"Agent {agent.name} failed, considering early termination")
-
-                except asyncio.TimeoutError:
-                    logger.error(f"Agent {agent.name} timed out")
-                    results.append({'success': False, 'agent': agent.name, 'error': 'Timeout'})
-
-            else:
-                logger.info(f"Agent {agent.name} not ready to contribute, skipping")
+            # execute() skips at once when no running agent will write a missing prerequisite
+            try:
+                result = await asyncio.wait_for(agent.execute(), timeout=self.default_timeout)
+                if result.get('skipped'):
+                    logger.info(f"Agent {agent.name} not ready to contribute, skipping")
+                    continue
+                results.append(result)
+
+                # Check if we should stop early
+                if not result.get('success', False):
+                    logger.warning(f"Agent {agent.name} failed, considering early termination")
+
+            except asyncio.TimeoutError:
+                logger.error(f"Agent {agent.name} timed out")
+                results.append({'success': False, 'agent': agent.name, 'error': 'Timeout'})
 
         return results
 
     async def _finalize_results(self, execution_results: Dict[str, Any], start_time: float) -> Dict[str, Any]:
         """Finalize and format the results"""
-        # Get final response from blackboard
-        final_response = self.blackboard.read('final_response')
-        selected_themes = self.blackboard.read('selected_themes')
-        quality_score = self.blackboard.read('quality_score')
-        processing_status = self.blackboard.get_processing_status()
+        # Get final state from blackboard in a single locked read
+        state = self.blackboard.snapshot(self.FINAL_RESULT_KEYS)
+        final_response = state['final_response']
+        selected_themes = state['selected_themes']
+        quality_score = state['quality_score']
+        processing_status = state['processing_status'] or {}
 
         # Extract summary text from response object if needed
         summary_text = ''
@@ -400,7 +430,7 @@ class BlackboardControlStrategy:
         }
 
         # Add streaming updates if available
-        streaming_updates = self.blackboard.read('streaming_updates')
+        streaming_updates = state['streaming_updates']
         if streaming_updates:
             results['streaming_updates'] = streaming_updates
 
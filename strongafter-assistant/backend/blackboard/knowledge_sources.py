@@ -18,18 +18,100 @@ Agents included:
 """
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
 import time
 import json
-from typing import Dict, Any, List, Optional
+import re
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import numpy as np
+import orjson
 import google.generativeai as genai
 
 from .base_agent import BaseAgent, AgentCapabilities
-from .blackboard import TherapyBlackboard
+from .blackboard import TherapyBlackboard, THEME_SCORES_DTYPE
+from .concurrency import ProcessSemaphore
+from .semantic_cache import SemanticResponseCache
 
 
 logger = logging.getLogger(__name__)
 
+# Reused decoder for extracting the first JSON object from model responses
+_JSON_DECODER = json.JSONDecoder()
+
+# Completed '"<theme number>": <score>' pair inside a partially streamed JSON object
+_SCORE_PAIR_RE = re.compile(r'"(\d+)"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}]')
+
+# Citations in either the old ⁽n⁾ format or the superscript ¹²³ format
+_CITATION_RE = re.compile(r'⁽(?P<old>\d+)⁾|(?P<sup>[¹²³⁴⁵⁶⁷⁸⁹⁰]+)')
+_SUPERSCRIPT_TABLE = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+
+# Excerpt text length included in summary prompts
+EXCERPT_PREVIEW_CHARS = 500
+
+# Maximum number of concurrent Gemini requests shared by all agents
+GEMINI_MAX_CONCURRENCY = 4
+
+# Bounded pool for synchronous Gemini SDK calls, shared across event loops
+GEMINI_EXECUTOR = ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY, thread_name_prefix='gemini')
+
+# Gemini request slots shared by every request's event loop in this process
+_GEMINI_SLOTS = ProcessSemaphore(GEMINI_MAX_CONCURRENCY)
+
+
+async def _generate_content(gemini_model, prompt: str):
+    """
+    Call Gemini without blocking the event loop
+
+    Args:
+        gemini_model: Gemini GenerativeModel instance
+        prompt: The prompt to send
+
+    Returns:
+        The Gemini response object
+    """
+    async with _GEMINI_SLOTS:
+        if hasattr(gemini_model, 'generate_content_async'):
+            return await gemini_model.generate_content_async(prompt)
+
+        # Older SDKs only offer the blocking call, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(GEMINI_EXECUTOR, gemini_model.generate_content, prompt)
+
+
+async def _stream_content(gemini_model, prompt: str) -> AsyncIterator[str]:
+    """
+    Stream a Gemini response without blocking the event loop
+
+    Args:
+        gemini_model: Gemini GenerativeModel instance
+        prompt: The prompt to send
+
+    Yields:
+        Text of each response chunk as it arrives
+    """
+    async with _GEMINI_SLOTS:
+        if not hasattr(gemini_model, 'generate_content_async'):
+            # Without async support, yield the whole response as a single chunk
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(GEMINI_EXECUTOR, gemini_model.generate_content, prompt)
+            yield response.text
+            return
+
+        response = await gemini_model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+
+@functools.lru_cache(maxsize=8)
+def _format_themes_block(themes: Tuple[Tuple[str, str], ...]) -> str:
+    """Render the numbered theme list for the theme analysis prompt"""
+    return "\n".join(
+        f"{i}. {label}: {description[:150]}..."
+        for i, (label, description) in enumerate(themes, 1)
+    )
+
 
 class ThemeAnalysisAgent(BaseAgent):
     """
@@ -37,7 +119,8 @@ class ThemeAnalysisAgent(BaseAgent):
     Provides high-quality semantic understanding for theme relevance scoring.
     """
 
-    def __init__(self, blackboard: TherapyBlackboard, gemini_model):
+    def __init__(self, blackboard: TherapyBlackboard, gemini_model,
+                 response_cache: Optional[SemanticResponseCache] = None):
         capabilities = AgentCapabilities(
             can_process_parallel=True,  # Can run in parallel with other agents
             requires_gpu=False,
@@ -54,6 +137,7 @@ class ThemeAnalysisAgent(BaseAgent):
         )
 
         self.gemini_model = gemini_model
+        self.response_cache = response_cache
 
     def can_contribute(self) -> bool:
         """Primary theme analysis agent - always ready when prerequisites are met"""
@@ -70,7 +154,8 @@ class ThemeAnalysisAgent(BaseAgent):
         return ['preprocessed_text', 'theme_candidates']
 
     def get_outputs(self) -> List[str]:
-        return ['theme_scores', 'selected_themes', 'theme_analysis_confidence']
+        return ['partial_theme_scores', 'theme_scores', 'theme_scores_arr', 'selected_themes',
+                'theme_analysis_confidence']
 
     async def contribute(self) -> Dict[str, Any]:
         """Primary theme analysis using Gemini for accurate semantic understanding"""
@@ -79,15 +164,42 @@ class ThemeAnalysisAgent(BaseAgent):
         user_text = self.blackboard.read('preprocessed_text')
         theme_candidates = self.blackboard.read('theme_candidates')
 
+        # Serve repeated or semantically equivalent queries from the cache
+        if self.response_cache is not None:
+            cached = await self.response_cache.lookup(user_text, 'theme_scores')
+            if cached:
+                self.blackboard.write('theme_scores', cached['theme_scores'], self.name, 0.9)
+                if 'theme_scores_arr' in cached:
+                    self.blackboard.write('theme_scores_arr', cached['theme_scores_arr'], self.name, 0.9)
+                self.blackboard.write('selected_themes', cached['selected_themes'], self.name, 0.9)
+                self.blackboard.write('theme_analysis_confidence', 0.9, self.name)
+
+                logger.info("Theme analysis served from response cache")
+                return {
+                    'success': True,
+                    'processing_time': time.time() - start_time,
+                    'confidence': 0.9,
+                    'cache_hit': True,
+                    'outputs': self.get_outputs()
+                }
+
         logger.info(f"Starting primary Gemini theme analysis for {len(theme_candidates)} themes")
 
         try:
             # Use simplified Gemini analysis for speed
-            scores = await self._analyze_themes_gemini(user_text, theme_candidates)
-            selected_themes = self._select_top_themes(scores, theme_candidates)
+            scores_arr = await self._analyze_themes_gemini(user_text, theme_candidates)
+            selected_themes = self._select_top_themes(scores_arr, theme_candidates)
+
+            # Legacy dict view keyed by theme ID for consumers that look up by ID
+            scores = dict(zip((theme['id'] for theme in theme_candidates), scores_arr.tolist()))
+
+            if self.response_cache is not None:
+                self.response_cache.update(user_text, theme_scores=scores, theme_scores_arr=scores_arr,
+                                           selected_themes=selected_themes)
 
             # Write results
             self.blackboard.write('theme_scores', scores, self.name, 0.9)
+            self.blackboard.write('theme_scores_arr', scores_arr, self.name, 0.9)
             self.blackboard.write('selected_themes', selected_themes, self.name, 0.9)
             self.blackboard.write('theme_analysis_confidence', 0.9, self.name)
 
@@ -105,14 +217,17 @@ class ThemeAnalysisAgent(BaseAgent):
             logger.error(f"Gemini theme analysis failed: {e}")
             raise
 
-    async def _analyze_themes_gemini(self, user_text: str, themes: List[Dict]) -> Dict[str, float]:
-        """Primary Gemini theme analysis with enhanced semantic understanding"""
-        # Create detailed theme list with descriptions
-        theme_list = []
-        for i, theme in enumerate(themes, 1):
-            theme_list.append(f"{i}. {theme['label']}: {theme['description'][:150]}...")
+    async def _analyze_themes_gemini(self, user_text: str, themes: List[Dict]) -> np.ndarray:
+        """
+        Primary Gemini theme analysis with enhanced semantic understanding
 
-        themes_text = "\n".join(theme_list)
+        Returns:
+            Array of relevance scores aligned with the order of themes
+        """
+        # Create detailed theme list with descriptions (cached across requests)
+        themes_text = _format_themes_block(
+            tuple((theme['label'], theme['description']) for theme in themes)
+        )
 
         prompt = f"""You are analyzing the relevance of trauma recovery themes to a user's input. Be extremely strict about relevance.
 
@@ -140,85 +255,106 @@ BE EXTREMELY STRICT: Only give scores above 30 if there's a clear emotional dist
 Return ONLY a valid JSON object with ALL theme scores:
 {{"1": score, "2": score, "3": score, ...}}"""
 
-        response = self.gemini_model.generate_content(prompt)
+        response_text = await self._stream_theme_scores(prompt, themes)
 
-        logger.info(f"Gemini raw response (first 200 chars): {response.text[:200]}")
+        logger.info(f"Gemini raw response (first 200 chars): {response_text[:200]}")
 
         # Parse response with improved error handling
-        scores = {}
+        scores = None
         try:
             # Try to extract JSON from response
-            response_text = response.text.strip()
+            response_text = response_text.strip()
 
-            # Find JSON object in response
+            # Find JSON object in response and decode the first complete one
             start_idx = response_text.find('{')
             if start_idx != -1:
-                # Find matching closing brace
-                brace_count = 0
-                end_idx = start_idx
-                for i in range(start_idx, len(response_text)):
-                    if response_text[i] == '{':
-                        brace_count += 1
-                    elif response_text[i] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end_idx = i
-                            break
-
-                if brace_count == 0:
-                    json_str = response_text[start_idx:end_idx + 1]
-                    logger.info(f"Gemini extracted JSON: {json_str[:200]}...")
-                    parsed = json.loads(json_str)
-
-                    for i, theme in enumerate(themes, 1):
-                        key = str(i)
-                        if key in parsed:
-                            score = float(parsed[key])
-                            scores[theme['id']] = max(0.0, min(100.0, score))  # Clamp 0-100
-                        else:
-                            scores[theme['id']] = 0.0
-                else:
-                    raise ValueError("Incomplete JSON in Gemini response")
+                # Fast path: the response is a single object, possibly wrapped in a code fence
+                end_idx = response_text.rfind('}') + 1
+                try:
+                    parsed = orjson.loads(response_text[start_idx:end_idx])
+                except orjson.JSONDecodeError:
+                    parsed, end_idx = _JSON_DECODER.raw_decode(response_text, start_idx)
+                logger.info(f"Gemini extracted JSON: {response_text[start_idx:end_idx][:200]}...")
+
+                # Fill numbered scores by theme position in a single pass, missing themes score 0
+                scores = np.fromiter(
+                    (float(parsed.get(str(i), 0.0)) for i in range(1, len(themes) + 1)),
+                    dtype=THEME_SCORES_DTYPE,
+                    count=len(themes)
+                )
+                np.clip(scores, 0.0, 100.0, out=scores)  # Clamp 0-100
             else:
                 raise ValueError("No JSON found in Gemini response")
 
         except Exception as e:
             logger.warning(f"Failed to parse Gemini JSON response: {e}")
-            # Fallback: give low relevance to prevent false positives
-            for theme in themes:
-                scores[theme['id']] = 10.0  # Low default relevance
 
-        # Ensure all themes have scores
-        for theme in themes:
-            if theme['id'] not in scores:
-                scores[theme['id']] = 0.0
+        if scores is None:
+            # Fallback: give low relevance to prevent false positives
+            scores = np.full(len(themes), 10.0, dtype=THEME_SCORES_DTYPE)  # Low default relevance
 
-        logger.info(f"Gemini parsed scores sample: {dict(list(scores.items())[:5])}")
+        logger.info(f"Gemini parsed scores sample: {scores[:5].tolist()}")
         return scores
 
-    def _select_top_themes(self, scores: Dict[str, float], themes: List[Dict], max_themes: int = 3) -> List[Dict]:
+    async def _stream_theme_scores(self, prompt: str, themes: List[Dict]) -> str:
+        """
+        Stream the Gemini response, publishing theme scores as they complete
+
+        Each '"n": score' pair is written to 'partial_theme_scores' as soon as
+        it is fully received, so consumers can observe progress before the
+        full JSON object is available.
+
+        Returns:
+            The complete response text
+        """
+        buffer = ''
+        scan_pos = 0
+        partial_scores = {}
+
+        async for text in _stream_content(self.gemini_model, prompt):
+            buffer += text
+
+            found = False
+            for match in _SCORE_PAIR_RE.finditer(buffer, scan_pos):
+                index = int(match.group(1))
+                if 1 <= index <= len(themes):
+                    score = max(0.0, min(100.0, float(match.group(2))))  # Clamp 0-100
+                    partial_scores[themes[index - 1]['id']] = score
+                    found = True
+                scan_pos = match.end()
+
+            if found:
+                self.blackboard.write('partial_theme_scores', dict(partial_scores), self.name, 0.5)
+
+        return buffer
+
+    def _select_top_themes(self, score_arr: np.ndarray, themes: List[Dict], max_themes: int = 3) -> List[Dict]:
         """Select top themes based on relevance scores with minimum threshold"""
-        # Sort themes by score
-        sorted_themes = sorted(
-            themes,
-            key=lambda theme: scores.get(theme['id'], 0.0),
-            reverse=True
-        )
+        # Partially sort themes by score, only the top candidates are needed
+        k = min(max_themes + 1, len(themes))
+        if k < len(themes):
+            # Keep every theme tied with the k-th best score so ties resolve by position
+            kth_score = -np.partition(-score_arr, k - 1)[k - 1]
+            top_idx = np.flatnonzero(score_arr >= kth_score)
+        else:
+            top_idx = np.arange(k)
+        # Order by descending score, breaking ties by original position like a stable sort
+        top_idx = top_idx[np.lexsort((top_idx, -score_arr[top_idx]))][:k].tolist()
+        top_scores = score_arr[top_idx].tolist()
 
         # Select top themes with minimum score threshold
         selected = []
-        for theme in sorted_themes:
-            theme_score = scores.get(theme['id'], 0.0)
+        for i, theme_score in zip(top_idx, top_scores):
             if theme_score >= 20.0 and len(selected) < max_themes:  # Minimum relevance threshold
-                theme_with_score = theme.copy()
+                theme_with_score = themes[i].copy()
                 theme_with_score['relevance_score'] = theme_score
                 selected.append(theme_with_score)
 
         # Only select a theme if it has a meaningful score (> 10)
-        if not selected and sorted_themes:
-            top_theme_score = scores.get(sorted_themes[0]['id'], 0.0)
+        if not selected and top_idx:
+            top_theme_score = top_scores[0]
             if top_theme_score > 10.0:  # Only select if there's some relevance
-                top_theme = sorted_themes[0].copy()
+                top_theme = themes[top_idx[0]].copy()
                 top_theme['relevance_score'] = top_theme_score
                 selected.append(top_theme)
 
@@ -268,10 +404,15 @@ class ExcerptRetrievalAgent(BaseAgent):
         logger.info(f"Retrieving excerpts for {len(selected_themes)} themes")
 
         try:
+            # Retrieve excerpts for all themes concurrently
+            results = await asyncio.gather(
+                *(self._get_excerpts_for_theme(theme) for theme in selected_themes)
+            )
             excerpts = {}
-            for theme in selected_themes:
-                theme_excerpts = await self._get_excerpts_for_theme(theme)
+            total_excerpts = 0
+            for theme, theme_excerpts in zip(selected_themes, results):
                 excerpts[theme['id']] = theme_excerpts
+                total_excerpts += len(theme_excerpts)
 
             self.blackboard.write('retrieved_excerpts', excerpts, self.name, 0.95)
 
@@ -279,7 +420,7 @@ class ExcerptRetrievalAgent(BaseAgent):
             self.blackboard.add_streaming_update({
                 'type': 'excerpts_retrieved',
                 'theme_count': len(excerpts),
-                'total_excerpts': sum(len(ex) for ex in excerpts.values())
+                'total_excerpts': total_excerpts
             }, self.name)
 
             processing_time = time.time() - start_time
@@ -304,12 +445,59 @@ class ExcerptRetrievalAgent(BaseAgent):
         return []
 
 
+# Prompt templates for summary generation, formatted once per request
+_NO_THEME_PROMPT = """The user has shared: "{user_text}"
+
+This input doesn't relate to trauma recovery or mental health topics.
+Please provide a brief, friendly response that:
+1. Acknowledges what they shared
+2. Gently indicates this platform specializes in trauma recovery support
+3. Offers to help if they have trauma-related concerns
+
+Keep the response natural and conversational, not formulaic."""
+
+_SUMMARY_PROMPT = """Create a 2-paragraph therapeutic summary for trauma recovery using the provided themes and excerpts.
+
+THEMES:
+{themes_text}
+
+EXCERPTS:
+{excerpts_text}
+
+INSTRUCTIONS:
+- Write exactly 2 paragraphs about trauma recovery
+- Reference specific excerpts throughout your summary
+- Use citation format ¹ ² ³ etc. when referencing excerpts
+- Include at least 3-5 citations from the excerpts above
+- Make the summary supportive and therapeutic in tone
+- Focus on healing, recovery, and practical insights
+
+IMPORTANT: You MUST include citations in the format ¹ when referencing excerpt content.
+
+After your summary, add a References section using this format:
+## References
+¹ Author, A. (Year). *Title*. Publisher. [Get this book](http://strongafter.org)
+² Author, B. (Year). *Title*. Publisher. [Get this book](http://strongafter.org)"""
+
+# Used when no excerpts were retrieved, so there is nothing to cite
+_THEMES_ONLY_PROMPT = """Create a 2-paragraph therapeutic summary for trauma recovery using the provided themes.
+
+THEMES:
+{themes_text}
+
+INSTRUCTIONS:
+- Write exactly 2 paragraphs about trauma recovery
+- Make the summary supportive and therapeutic in tone
+- Focus on healing, recovery, and practical insights"""
+
+
 class SummaryGenerationAgent(BaseAgent):
     """
     Agent responsible for generating high-quality summaries using Gemini.
     """
 
-    def __init__(self, blackboard: TherapyBlackboard, gemini_model, book_metadata=None):
+    def __init__(self, blackboard: TherapyBlackboard, gemini_model, book_metadata=None,
+                 response_cache: Optional[SemanticResponseCache] = None):
         capabilities = AgentCapabilities(
             can_process_parallel=False,  # Needs full context
             requires_gpu=False,
@@ -327,6 +515,7 @@ class SummaryGenerationAgent(BaseAgent):
 
         self.gemini_model = gemini_model
         self.book_metadata = book_metadata or {}
+        self.response_cache = response_cache
 
     def can_contribute(self) -> bool:
         """Can contribute when themes are available"""
@@ -345,24 +534,35 @@ class SummaryGenerationAgent(BaseAgent):
 
         themes = self.blackboard.read('selected_themes')
         user_text = self.blackboard.read('user_input')
+        cache_key = self.blackboard.read('preprocessed_text')
+
+        # Serve repeated queries from the cache; the response speaks to the
+        # user's own words, so similar queries from others never receive it
+        if self.response_cache is not None and cache_key:
+            cached = await self.response_cache.lookup(cache_key, 'final_response', semantic=False)
+            if cached:
+                self.blackboard.write('final_response', cached['final_response'], self.name, 0.9)
+                self.blackboard.write('citations', cached['final_response'].get('citations', []), self.name)
+
+                logger.info("Summary served from response cache")
+                return {
+                    'success': True,
+                    'processing_time': time.time() - start_time,
+                    'confidence': 0.9,
+                    'cache_hit': True,
+                    'outputs': ['final_response', 'citations']
+                }
 
         # If no themes were selected, generate a contextual response
         if not themes or len(themes) == 0:
             logger.info("No relevant trauma themes found - generating contextual response")
 
             # Generate a response that acknowledges the user's input
-            prompt = f"""The user has shared: "{user_text}"
-
-This input doesn't relate to trauma recovery or mental health topics.
-Please provide a brief, friendly response that:
-1. Acknowledges what they shared
-2. Gently indicates this platform specializes in trauma recovery support
-3. Offers to help if they have trauma-related concerns
-
-Keep the response natural and conversational, not formulaic."""
+            prompt = _NO_THEME_PROMPT.format(user_text=user_text)
 
             try:
-                response_text = self.gemini_model.generate_content(prompt).text.strip()
+                response = await _generate_content(self.gemini_model, prompt)
+                response_text = response.text.strip()
             except:
                 # Fallback if generation fails
                 response_text = f"Thank you for sharing about {user_text[:50]}. While this platform specializes in trauma recovery and mental health support, I'm here if you need help with those topics."
@@ -411,6 +611,9 @@ Keep the response natural and conversational, not formulaic."""
             self.blackboard.write('final_response', response, self.name, 0.9)
             self.blackboard.write('citations', citations, self.name)
 
+            if self.response_cache is not None and cache_key:
+                self.response_cache.update(cache_key, final_response=response)
+
             # Add streaming update
             self.blackboard.add_streaming_update({
                 'type': 'summary_complete',
@@ -437,43 +640,29 @@ Keep the response natural and conversational, not formulaic."""
         # Build optimized prompt with excerpts list
         prompt = self._build_summary_prompt(user_text, themes, excerpts)
 
-        response = self.gemini_model.generate_content(prompt)
+        response = await _generate_content(self.gemini_model, prompt)
         return response.text.strip()
 
     def _build_summary_prompt(self, user_text: str, themes: List[Dict], excerpts: List[Dict]) -> str:
         """Build optimized summary prompt"""
-        themes_text = "\n".join([f"- {t['label']}: {t['description']}" for t in themes])
-
-        excerpts_text = ""
-        for i, item in enumerate(excerpts[:10], 1):  # Limit to top 10 for speed
-            excerpt = item['excerpt']
-            title = excerpt.get('title', 'Unknown')
-            excerpts_text += f"EXCERPT {i} ({title}):\n{excerpt['text'][:500]}...\n\n"
-
-        prompt = f"""Create a 2-paragraph therapeutic summary for trauma recovery using the provided themes and excerpts.
-
-THEMES:
-{themes_text}
+        if not excerpts:
+            return self._build_themes_only_prompt(user_text, themes)
 
-EXCERPTS:
-{excerpts_text}
-
-INSTRUCTIONS:
-- Write exactly 2 paragraphs about trauma recovery
-- Reference specific excerpts throughout your summary
-- Use citation format ¹ ² ³ etc. when referencing excerpts
-- Include at least 3-5 citations from the excerpts above
-- Make the summary supportive and therapeutic in tone
-- Focus on healing, recovery, and practical insights
+        themes_text = "\n".join([f"- {t['label']}: {t['description']}" for t in themes])
 
-IMPORTANT: You MUST include citations in the format ¹ when referencing excerpt content.
+        # Limit to top 10 for speed; previews are truncated once at ingestion when available
+        excerpts_text = "".join(
+            f"EXCERPT {i} ({item['excerpt'].get('title', 'Unknown')}):\n"
+            f"{item['excerpt'].get('text_preview') or item['excerpt']['text'][:EXCERPT_PREVIEW_CHARS]}...\n\n"
+            for i, item in enumerate(excerpts[:10], 1)
+        )
 
-After your summary, add a References section using this format:
-## References
-¹ Author, A. (Year). *Title*. Publisher. [Get this book](http://strongafter.org)
-² Author, B. (Year). *Title*. Publisher. [Get this book](http://strongafter.org)"""
+        return _SUMMARY_PROMPT.format(themes_text=themes_text, excerpts_text=excerpts_text)
 
-        return prompt
+    def _build_themes_only_prompt(self, user_text: str, themes: List[Dict]) -> str:
+        """Build summary prompt without the excerpts block and citation instructions"""
+        themes_text = "\n".join([f"- {t['label']}: {t['description']}" for t in themes])
+        return _THEMES_ONLY_PROMPT.format(themes_text=themes_text)
 
     def _extract_excerpts_from_themes(self, themes: List[Dict]) -> List[Dict]:
         """Extract all excerpts from themes for summary generation"""
@@ -485,20 +674,15 @@ After your summary, add a References section using this format:
 
     def _extract_citations(self, summary: str) -> List[Dict]:
         """Extract citation information from summary"""
-        # Simple citation extraction
-        import re
-        # Look for both old format and new superscript format
-        citations_old = re.findall(r'⁽(\d+)⁾', summary)
-        citations_new = re.findall(r'([¹²³⁴⁵⁶⁷⁸⁹⁰]+)', summary)
-        # Convert superscript to numbers
-        superscript_map = {'⁰': '0', '¹': '1', '²': '2', '³': '3', '⁴': '4', '⁵': '5', '⁶': '6', '⁷': '7', '⁸': '8', '⁹': '9'}
-        citations_converted = []
-        for c in citations_new:
-            converted = ''.join(superscript_map.get(char, char) for char in c)
-            citations_converted.append(converted)
-
-        all_citations = citations_old + citations_converted
-        return [{'number': int(c), 'type': 'excerpt'} for c in all_citations if c.isdigit()]
+        # Single scan matching both old ⁽n⁾ format and new superscript format
+        citations = []
+        for match in _CITATION_RE.finditer(summary):
+            if match.lastgroup == 'old':
+                number = match.group('old')
+            else:
+                number = match.group('sup').translate(_SUPERSCRIPT_TABLE)
+            citations.append({'number': int(number), 'type': 'excerpt'})
+        return citations
 
 
 class QualityAssuranceAgent(BaseAgent):
@@ -616,11 +800,12 @@ class StreamingAgent(BaseAgent):
             capabilities=capabilities
         )
 
+        # Sequence number of the last streaming update sent to the user
+        self.last_seq = 0
+
     def can_contribute(self) -> bool:
         """Can always contribute if there are updates to stream"""
-        updates = self.blackboard.read('streaming_updates') or []
-        last_streamed = getattr(self, 'last_streamed_count', 0)
-        return len(updates) > last_streamed
+        return self.blackboard.updates_seq > self.last_seq
 
     def get_prerequisites(self) -> List[str]:
         return []
@@ -630,10 +815,8 @@ class StreamingAgent(BaseAgent):
 
     async def contribute(self) -> Dict[str, Any]:
         """Process and format streaming updates"""
-        updates = self.blackboard.read('streaming_updates') or []
-        last_streamed = getattr(self, 'last_streamed_count', 0)
+        new_updates, self.last_seq = self.blackboard.drain_streaming_updates()
 
-        new_updates = updates[last_streamed:]
         if new_updates:
             streaming_response = {
                 'type': 'progress_update',
@@ -642,7 +825,6 @@ class StreamingAgent(BaseAgent):
             }
 
             self.blackboard.write('streaming_response', streaming_response, self.name)
-            self.last_streamed_count = len(updates)
 
             logger.info(f"Streamed {len(new_updates)} updates")
 
@@ -650,4 +832,4 @@ class StreamingAgent(BaseAgent):
             'success': True,
             'updates_streamed': len(new_updates),
             'outputs': ['streaming_response']
-        }
\ No newline at end of file
+        }
@@ -7,20 +7,125 @@ and response times compared to cloud-based models.
 """
 
 import asyncio
+import functools
+import hashlib
 import logging
 import json
+import os
+import random
 import re
+import tempfile
+import threading
 import time
-from typing import Dict, Any, List, Optional
-import requests
+import weakref
+from collections import OrderedDict
+from contextlib import aclosing, asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import aiohttp
+import numpy as np
+import orjson
 from dataclasses import dataclass
 
+try:
+    import diskcache
+except ImportError:  # Optional: cross-process score cache
+    diskcache = None
+
 from .base_agent import BaseAgent, AgentCapabilities
-from .blackboard import TherapyBlackboard
+from .blackboard import TherapyBlackboard, THEME_SCORES_DTYPE
+from .concurrency import ProcessSemaphore
 
 
 logger = logging.getLogger(__name__)
 
+# Reused decoder for responses with text after the JSON object
+_JSON_DECODER = json.JSONDecoder()
+
+# Bare numbers in a response, skipping [n] position identifiers
+_DIGITS_RE = re.compile(r'(?<![\[\d])\d+(?![\]\d])')
+
+# Completed '"[n]": score' pair inside a partially streamed JSON object
+_SCORE_PAIR_RE = re.compile(r'"\[?(\d+)\]?"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}]')
+
+# Streamed characters without any JSON object before a response is abandoned
+STREAM_ABORT_CHARS = 1024
+
+# Number of themes scored per Ollama prompt; batches are scored concurrently
+BATCH_SIZE = 16
+
+# Maximum number of (user text, theme set) results kept in the score cache
+SCORE_CACHE_SIZE = 256
+
+# Part of every score cache key; bump it when the scoring prompt or its
+# parsing changes so scores from the old prompt are not served
+SCORE_PROMPT_VERSION = 1
+
+# Directory and lifetime (seconds) of the score cache shared between worker processes
+SCORE_CACHE_DIR = os.getenv("SCORE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "score_cache"))
+SHARED_SCORE_CACHE_TTL = 24 * 3600
+
+# Maximum concurrent Ollama generate requests, matching the server's parallelism
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Attempts for an Ollama request failing with a connection error or 5xx status
+OLLAMA_RETRY_ATTEMPTS = 3
+OLLAMA_RETRY_BASE_DELAY = 0.1
+
+# Ollama request slots shared by every request's event loop in this process
+_OLLAMA_SLOTS = ProcessSemaphore(OLLAMA_NUM_PARALLEL)
+
+
+@functools.lru_cache(maxsize=None)
+def _position_keys(count: int) -> Tuple[Tuple[str, str], ...]:
+    """Bracketed and bare JSON keys ("[1]", "1") for each theme position in a batch"""
+    return tuple((f"[{i}]", str(i)) for i in range(1, count + 1))
+
+
+@asynccontextmanager
+async def _ollama_slot():
+    """Hold one of the Ollama request slots, logging noticeable waits"""
+    wait_start = time.time()
+    async with _OLLAMA_SLOTS:
+        wait_time = time.time() - wait_start
+        if wait_time > 0.01:
+            logger.debug(f"Waited {wait_time:.2f}s for an Ollama request slot")
+        yield
+
+
+# One keep-alive HTTP session per event loop, shared by every local LLM agent.
+# The blackboard app runs each request on its own loop and closes the session
+# when the request ends, so connections are reused between the Ollama calls
+# of one request (theme batches, retries) but not from one request to the next.
+_ollama_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _ollama_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session for the running event loop"""
+    loop = asyncio.get_running_loop()
+
+    # Sessions are bound to the loop that created them, and requests may
+    # each run on a fresh loop
+    session = _ollama_sessions.get(loop)
+    if session is None or session.closed:
+        session = _ollama_sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60)
+        )
+    return session
+
+
+async def close_ollama_session() -> None:
+    """
+    Close the running event loop's HTTP session
+
+    Sessions keep their loop alive, so callers running requests on a fresh
+    loop must call this before closing the loop.
+    """
+    session = _ollama_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
 
 @dataclass
 class LocalLLMConfig:
@@ -65,6 +170,17 @@ class LocalLLMAgent(BaseAgent):
         self.is_available = False
         self.model_loaded = False
 
+        # Rendered prompt prefix per theme batch, keyed by theme IDs
+        self._theme_block_cache: Dict[Tuple[str, ...], str] = {}
+
+        # LRU cache of theme scores keyed by a digest of model, prompt, user text and theme IDs
+        self._score_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+        # Same scores shared across worker processes, opened on first use
+        self._shared_score_cache = None
+        self._shared_cache_attempted = False
+        self._shared_cache_lock = threading.Lock()
+
         # Initialize and check availability
         # Note: async initialization will happen on first use
         self._initialization_attempted = False
@@ -72,45 +188,108 @@ class LocalLLMAgent(BaseAgent):
     async def _initialize(self) -> None:
         """Initialize the local LLM connection"""
         try:
-            await self._check_ollama_status()
-            await self._ensure_model_loaded()
+            tags = await self._get_tags()
+            await self._ensure_model_loaded(tags)
             self.is_available = True
             logger.info(f"Local LLM agent initialized successfully with {self.config.model_name}")
         except Exception as e:
             logger.error(f"Failed to initialize local LLM: {e}")
             self.is_available = False
 
-    async def _check_ollama_status(self) -> bool:
-        """Check if Ollama is running and accessible"""
+    async def aclose(self) -> None:
+        """Close the shared HTTP session of the running event loop"""
+        await close_ollama_session()
+
+    async def _get_tags(self) -> Optional[Dict[str, Any]]:
+        """
+        Check that Ollama is accessible and list its local models
+
+        Returns:
+            The /api/tags response, or None if Ollama is not accessible
+        """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5.0)
-            return response.status_code == 200
+            async with _ollama_session().get(
+                f"{self.base_url}/api/tags", timeout=aiohttp.ClientTimeout(total=5.0)
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                logger.error(f"Ollama not accessible: status {response.status}")
+                return None
         except Exception as e:
             logger.error(f"Ollama not accessible: {e}")
-            return False
+            return None
+
+    async def _ensure_model_loaded(self, tags: Optional[Dict[str, Any]]) -> bool:
+        """
+        Ensure the specified model is loaded
+
+        Args:
+            tags: The /api/tags response from _get_tags
 
-    async def _ensure_model_loaded(self) -> bool:
-        """Ensure the specified model is loaded"""
+        Returns:
+            True if the model is available
+        """
         try:
+            if tags is None:
+                return False
+
             # Check if model exists
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5.0)
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                model_names = [model['name'] for model in models]
+            models = tags.get('models', [])
+            model_names = [model['name'] for model in models]
 
-                if self.config.model_name not in model_names:
-                    logger.warning(f"Model {self.config.model_name} not found. Available: {model_names}")
-                    return False
+            if self.config.model_name not in model_names:
+                logger.warning(f"Model {self.config.model_name} not found. Available: {model_names}")
+                return False
 
-                # Test model with a simple prompt
+            # Test model with a simple prompt only when explicitly requested
+            if os.getenv("LLM_WARMUP_TEST"):
                 test_response = await self._call_ollama("Test prompt", max_tokens=10)
                 self.model_loaded = test_response is not None
-                return self.model_loaded
+            else:
+                self.model_loaded = True
+            return self.model_loaded
 
         except Exception as e:
             logger.error(f"Error checking model availability: {e}")
             return False
 
+    async def _post_generate(self, payload: Dict[str, Any]) -> aiohttp.ClientResponse:
+        """
+        Send a generate request, retrying transient failures with jittered backoff
+
+        Connection errors and 5xx responses are retried; 4xx responses and
+        timeouts (which already used the full time budget) are not.
+
+        Args:
+            payload: JSON body for /api/generate
+
+        Returns:
+            The response, which the caller must release
+        """
+        for attempt in range(OLLAMA_RETRY_ATTEMPTS):
+            last_attempt = attempt == OLLAMA_RETRY_ATTEMPTS - 1
+            try:
+                response = await _ollama_session().post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+                )
+            except asyncio.TimeoutError:
+                # aiohttp.ServerTimeoutError is also a ClientConnectionError,
+                # so timeouts must be re-raised before the retry branch
+                raise
+            except aiohttp.ClientConnectionError as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"Ollama connection failed, retrying: {e}")
+            else:
+                if response.status < 500 or last_attempt:
+                    return response
+                response.release()
+                logger.warning(f"Ollama API error {response.status}, retrying")
+
+            await asyncio.sleep(OLLAMA_RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.05)
+
     async def _call_ollama(self, prompt: str, max_tokens: Optional[int] = None) -> Optional[str]:
         """
         Make an API call to Ollama
@@ -133,23 +312,54 @@ class LocalLLMAgent(BaseAgent):
                 }
             }
 
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=self.config.timeout
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return None
+            async with _ollama_slot():
+                async with await self._post_generate(payload) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        return result.get('response', '').strip()
+                    else:
+                        logger.error(f"Ollama API error: {response.status}")
+                        return None
 
         except Exception as e:
             logger.error(f"Error calling Ollama: {e}")
             return None
 
+    async def _stream_ollama(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Stream a generation from Ollama
+
+        Args:
+            prompt: The prompt to send
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            Text of each response chunk as it arrives
+        """
+        payload = {
+            "model": self.config.model_name,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": self.config.temperature,
+                "num_predict": max_tokens or self.config.max_tokens
+            }
+        }
+
+        async with _ollama_slot():
+            async with await self._post_generate(payload) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Ollama API error: {response.status}")
+
+                # Ollama streams one JSON object per line
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = orjson.loads(line)
+                    yield chunk.get('response', '')
+                    if chunk.get('done'):
+                        break
+
     def can_contribute(self) -> bool:
         """Check if agent can contribute to theme analysis"""
         # LocalLLM agent is now disabled in favor of Gemini-based ThemeAnalysisAgent
@@ -176,7 +386,7 @@ class LocalLLMAgent(BaseAgent):
 
     def get_outputs(self) -> List[str]:
         """Outputs produced by this agent"""
-        return ['theme_scores', 'selected_themes', 'theme_analysis_confidence']
+        return ['theme_scores', 'theme_scores_arr', 'selected_themes', 'theme_analysis_confidence']
 
     async def contribute(self) -> Dict[str, Any]:
         """
@@ -202,17 +412,25 @@ class LocalLLMAgent(BaseAgent):
         logger.info(f"Starting local LLM theme analysis for {len(theme_candidates)} themes")
 
         try:
-            # Generate theme scores
-            theme_scores = await self._analyze_themes(user_text, theme_candidates)
+            # Generate theme scores, aligned with theme_candidates
+            scores_arr = await self._analyze_themes(user_text, theme_candidates)
 
             # Select top themes
-            selected_themes = self._select_top_themes(theme_scores, theme_candidates)
+            selected_themes = self._select_top_themes(scores_arr, theme_candidates)
 
             # Calculate confidence
-            confidence = self._calculate_confidence(theme_scores)
+            confidence = self._calculate_confidence(scores_arr)
+
+            # Legacy dict view keyed by theme ID for consumers that look up by ID
+            theme_scores = dict(zip(
+                (theme['id'] for theme in theme_candidates),
+                map(float, scores_arr.tolist())
+            ))
 
             # Write results to blackboard
             self.blackboard.write('theme_scores', theme_scores, self.name, confidence)
+            # Scores are held as uint8 here but published in the shared blackboard dtype
+            self.blackboard.write('theme_scores_arr', scores_arr.astype(THEME_SCORES_DTYPE), self.name, confidence)
             self.blackboard.write('selected_themes', selected_themes, self.name, confidence)
             self.blackboard.write('theme_analysis_confidence', confidence, self.name)
 
@@ -233,7 +451,7 @@ class LocalLLMAgent(BaseAgent):
                 'selected_themes': selected_themes,
                 'confidence': confidence,
                 'processing_time': processing_time,
-                'outputs': ['theme_scores', 'selected_themes', 'theme_analysis_confidence']
+                'outputs': self.get_outputs()
             }
 
         except Exception as e:
@@ -242,7 +460,7 @@ class LocalLLMAgent(BaseAgent):
             self.blackboard.write('local_llm_failed', True, self.name)
             raise
 
-    async def _analyze_themes(self, user_text: str, themes: List[Dict]) -> Dict[str, float]:
+    async def _analyze_themes(self, user_text: str, themes: List[Dict]) -> np.ndarray:
         """
         Analyze theme relevance using local LLM
 
@@ -251,28 +469,177 @@ class LocalLLMAgent(BaseAgent):
             themes: List of theme dictionaries
 
         Returns:
-            Dictionary mapping theme IDs to relevance scores
+            uint8 array of relevance scores (0-100) aligned with themes
         """
-        # Build optimized prompt for local model
-        prompt = self._build_analysis_prompt(user_text, themes)
-
-        # Get response from local LLM
-        response = await self._call_ollama(prompt)
+        # Identical text and theme set was scored before, skip Ollama entirely
+        cache_key = self._score_cache_key(user_text, themes)
+        cached = self._score_cache.get(cache_key)
+        if cached is not None:
+            self._score_cache.move_to_end(cache_key)
+            logger.info("LocalLLM theme scores served from cache")
+            return cached.copy()
+
+        # Another worker may already have scored this query
+        shared = await self._read_shared_scores(cache_key, len(themes))
+        if shared is not None:
+            self._remember_scores(cache_key, shared)
+            logger.info("LocalLLM theme scores served from shared cache")
+            return shared.copy()
+
+        # Split themes into fixed-size batches, each scored by its own prompt
+        batches = [themes[i:i + BATCH_SIZE] for i in range(0, len(themes), BATCH_SIZE)]
+        prompts = [self._build_analysis_prompt(user_text, batch) for batch in batches]
+
+        # Score batches from local LLM concurrently
+        batch_scores = await asyncio.gather(
+            *(self._score_batch(prompt, batch) for prompt, batch in zip(prompts, batches))
+        )
 
-        if not response:
+        if not all(result is not None for result in batch_scores):
             raise RuntimeError("Local LLM did not return a response")
 
-        # Debug logging for LLM response
-        logger.info(f"LocalLLM raw response (first 500 chars): {response[:500]}")
-
-        # Parse scores from response
-        scores = self._parse_theme_scores(response, themes)
+        # Write each batch into its slice of the score buffer, rounded to whole points
+        scores = np.empty(len(themes), dtype=np.uint8)
+        for start, batch, result in zip(range(0, len(themes), BATCH_SIZE), batches, batch_scores):
+            batch_arr = np.fromiter((result[theme['id']] for theme in batch),
+                                    dtype=np.float64, count=len(batch))
+            scores[start:start + len(batch)] = np.rint(batch_arr)
 
         # Debug logging for parsed scores
-        logger.info(f"LocalLLM parsed scores sample: {dict(list(scores.items())[:5])}")
+        logger.info(f"LocalLLM parsed scores sample: {scores[:5].tolist()}")
+
+        self._remember_scores(cache_key, scores)
+        await self._write_shared_scores(cache_key, scores)
 
         return scores
 
+    def _score_cache_key(self, user_text: str, themes: List[Dict]) -> bytes:
+        """Digest of the model, prompt version and batching, user text and theme IDs"""
+        prompt_tag = f"{self.config.model_name}|v{SCORE_PROMPT_VERSION}|b{BATCH_SIZE}|"
+        return hashlib.blake2b(
+            prompt_tag.encode() + user_text.encode() + b"|"
+            + b"|".join(str(theme['id']).encode() for theme in themes)
+        ).digest()
+
+    def _remember_scores(self, cache_key: bytes, scores: np.ndarray) -> None:
+        """Store scores in the in-process LRU cache"""
+        self._score_cache[cache_key] = scores.copy()
+        if len(self._score_cache) > SCORE_CACHE_SIZE:
+            self._score_cache.popitem(last=False)
+
+    def _open_shared_score_cache(self):
+        """Open the cross-process score cache once, when diskcache is installed"""
+        with self._shared_cache_lock:
+            if not self._shared_cache_attempted:
+                self._shared_cache_attempted = True
+                if diskcache is not None:
+                    try:
+                        self._shared_score_cache = diskcache.Cache(SCORE_CACHE_DIR)
+                    except Exception as e:
+                        logger.warning(f"Shared score cache unavailable: {e}")
+            return self._shared_score_cache
+
+    async def _read_shared_scores(self, cache_key: bytes, count: int) -> Optional[np.ndarray]:
+        """
+        Look up scores in the cross-process cache
+
+        The cache is SQLite backed, so the lookup runs in a worker thread.
+
+        Args:
+            cache_key: Digest from _score_cache_key
+            count: Number of themes the scores must cover
+
+        Returns:
+            uint8 score array, or None on a miss
+        """
+        if diskcache is None:
+            return None
+
+        def read():
+            cache = self._open_shared_score_cache()
+            return None if cache is None else cache.get(cache_key)
+
+        try:
+            raw = await asyncio.to_thread(read)
+        except Exception as e:
+            logger.warning(f"Shared score cache read failed: {e}")
+            return None
+
+        if raw is None or len(raw) != count:
+            return None
+        return np.frombuffer(raw, dtype=np.uint8).copy()
+
+    async def _write_shared_scores(self, cache_key: bytes, scores: np.ndarray) -> None:
+        """Store scores in the cross-process cache from a worker thread"""
+        if diskcache is None:
+            return
+
+        def write():
+            cache = self._open_shared_score_cache()
+            if cache is not None:
+                cache.set(cache_key, scores.tobytes(), expire=SHARED_SCORE_CACHE_TTL)
+
+        try:
+            await asyncio.to_thread(write)
+        except Exception as e:
+            logger.warning(f"Shared score cache write failed: {e}")
+
+    async def _score_batch(self, prompt: str, themes: List[Dict]) -> Optional[Dict[str, float]]:
+        """
+        Score a batch of themes, parsing the streamed response as it arrives
+
+        Streaming stops as soon as every theme in the batch has a score, or
+        when the response shows no sign of a JSON object.
+
+        Args:
+            prompt: Analysis prompt for the batch
+            themes: Themes in the batch, in prompt order
+
+        Returns:
+            Dictionary mapping theme IDs to scores, or None if the call failed
+        """
+        buffer = ''
+        scan_pos = 0
+        found: Dict[int, float] = {}
+
+        try:
+            async with aclosing(self._stream_ollama(prompt)) as chunks:
+                async for text in chunks:
+                    buffer += text
+
+                    for match in _SCORE_PAIR_RE.finditer(buffer, scan_pos):
+                        index = int(match.group(1))
+                        if 1 <= index <= len(themes):
+                            found[index] = float(match.group(2))
+                        scan_pos = match.end()
+
+                    # Every theme is scored, the rest of the generation is not needed
+                    if len(found) == len(themes):
+                        break
+
+                    if len(buffer) > STREAM_ABORT_CHARS and '{' not in buffer:
+                        logger.warning("LocalLLM response contains no JSON, abandoning stream")
+                        break
+        except Exception as e:
+            logger.error(f"Error calling Ollama: {e}")
+            return None
+
+        buffer = buffer.strip()
+        if not buffer:
+            return None
+
+        # Debug logging for LLM response
+        logger.info(f"LocalLLM raw response (first 500 chars): {buffer[:500]}")
+
+        if len(found) == len(themes):
+            raw_scores = np.fromiter((found[i] for i in range(1, len(themes) + 1)),
+                                     dtype=np.float64, count=len(themes))
+            clamped = np.clip(raw_scores, 0.0, 100.0)  # Clamp 0-100
+            return dict(zip((theme['id'] for theme in themes), clamped.tolist()))
+
+        # Incomplete stream, fall back to parsing the full text
+        return self._parse_theme_scores(buffer, themes)
+
     def _build_analysis_prompt(self, user_text: str, themes: List[Dict]) -> str:
         """
         Build an optimized prompt for fast theme analysis
@@ -288,16 +655,43 @@ class LocalLLMAgent(BaseAgent):
         logger.info(f"LocalLLM building prompt with user_text: '{user_text}'")
         logger.info(f"LocalLLM analyzing {len(themes)} themes")
 
-        # Create concise theme list
+        # The theme block comes first and is byte-identical across requests,
+        # so Ollama can reuse its cached prefill for it
+        key = tuple(theme['id'] for theme in themes)
+        prefix = self._theme_block_cache.get(key)
+        if prefix is None:
+            prefix = self._theme_block_cache[key] = self._build_theme_block(themes)
+
+        prompt = f"""{prefix}
+
+User input: "{user_text}"
+
+Your response:"""
+
+        logger.info(f"LocalLLM prompt length: {len(prompt)} characters")
+        logger.info(f"LocalLLM prompt preview: {prompt[:200]}...")
+        return prompt
+
+    def _build_theme_block(self, themes: List[Dict]) -> str:
+        """
+        Build the static part of the analysis prompt for a batch of themes
+
+        Args:
+            themes: List of themes to analyze
+
+        Returns:
+            Prompt text preceding the user input
+        """
+        # Create concise theme list with position identifiers
         theme_list = []
         for i, theme in enumerate(themes, 1):
-            theme_list.append(f"{i}. {theme['label']}: {theme['description'][:100]}...")
+            theme_list.append(f"[{i}] {theme['label']}: {theme['description'][:100]}...")
 
         themes_text = "\n".join(theme_list)
 
-        prompt = f"""You are analyzing theme relevance. Rate how relevant each theme is to the user's text on a scale of 0-100.
+        schema = ", ".join(f'"{key}": int' for key, _ in _position_keys(len(themes)))
 
-User input: "{user_text}"
+        return f"""You are analyzing theme relevance. Rate how relevant each theme is to the user's text on a scale of 0-100.
 
 Themes to rate:
 {themes_text}
@@ -312,13 +706,7 @@ Instructions:
 
 IMPORTANT: You must respond with ONLY a valid JSON object containing ALL theme scores. No other text.
 
-Example format: {{"1": 85, "2": 20, "3": 5, "4": 60}}
-
-Your response:"""
-
-        logger.info(f"LocalLLM prompt length: {len(prompt)} characters")
-        logger.info(f"LocalLLM prompt preview: {prompt[:200]}...")
-        return prompt
+Return JSON: {{{schema}}}"""
 
     def _parse_theme_scores(self, response: str, themes: List[Dict]) -> Dict[str, float]:
         """
@@ -331,98 +719,90 @@ Your response:"""
         Returns:
             Dictionary mapping theme IDs to scores
         """
-        scores = {}
+        # Themes the response does not score stay at 0.0
+        scores = dict.fromkeys((theme['id'] for theme in themes), 0.0)
 
         try:
             # Try to extract complete JSON from response
-            # Look for opening brace and find matching closing brace
+            # Ollama returns a lone object, so take the outermost braces
             start_idx = response.find('{')
             if start_idx != -1:
-                # Find the matching closing brace
-                brace_count = 0
-                end_idx = start_idx
-                for i in range(start_idx, len(response)):
-                    if response[i] == '{':
-                        brace_count += 1
-                    elif response[i] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end_idx = i
-                            break
-
-                if brace_count == 0:  # Found complete JSON
-                    json_str = response[start_idx:end_idx + 1]
-                    logger.info(f"LocalLLM extracted JSON: {json_str[:200]}...")
-                    parsed_scores = json.loads(json_str)
-                else:
+                end_idx = response.rfind('}')
+                if end_idx < start_idx:
                     raise ValueError("Incomplete JSON in response")
 
-                # Map numeric keys to theme IDs
-                for i, theme in enumerate(themes, 1):
-                    key = str(i)
+                json_str = response[start_idx:end_idx + 1]
+                logger.info(f"LocalLLM extracted JSON: {json_str[:200]}...")
+                try:
+                    parsed_scores = orjson.loads(json_str)
+                except orjson.JSONDecodeError:
+                    # Trailing text contained braces, decode just the first object
+                    parsed_scores, _ = _JSON_DECODER.raw_decode(response, start_idx)
+
+                # Map position identifiers ("[1]", or bare "1") to theme IDs
+                theme_ids = []
+                raw_scores = []
+                for (bracketed, bare), theme in zip(_position_keys(len(themes)), themes):
+                    key = bracketed if bracketed in parsed_scores else bare
                     if key in parsed_scores:
-                        score = float(parsed_scores[key])
-                        scores[theme['id']] = max(0.0, min(100.0, score))  # Clamp 0-100
+                        theme_ids.append(theme['id'])
+                        raw_scores.append(float(parsed_scores[key]))
+
+                clamped = np.clip(np.asarray(raw_scores, dtype=np.float64), 0.0, 100.0)  # Clamp 0-100
+                scores.update(zip(theme_ids, clamped.tolist()))
 
         except (json.JSONDecodeError, ValueError, KeyError) as e:
             logger.warning(f"Failed to parse JSON scores, using fallback parsing: {e}")
-            # Fallback: extract numbers from response
-            numbers = re.findall(r'\d+', response)
-            for i, theme in enumerate(themes):
-                if i < len(numbers):
-                    try:
-                        score = float(numbers[i])
-                        scores[theme['id']] = max(0.0, min(100.0, score))
-                    except ValueError:
-                        scores[theme['id']] = 0.0
-                else:
-                    scores[theme['id']] = 0.0
-
-        # Ensure all themes have scores
-        for theme in themes:
-            if theme['id'] not in scores:
-                scores[theme['id']] = 0.0
+            # Fallback: extract numbers from response, skipping [n] identifiers
+            numbers = _DIGITS_RE.findall(response)[:len(themes)]
+            clamped = np.clip(np.asarray(numbers, dtype=np.float64), 0.0, 100.0)
+            scores.update(zip((theme['id'] for theme in themes), clamped.tolist()))
 
         return scores
 
-    def _select_top_themes(self, scores: Dict[str, float], themes: List[Dict], max_themes: int = 3) -> List[Dict]:
+    def _select_top_themes(self, scores: np.ndarray, themes: List[Dict], max_themes: int = 3) -> List[Dict]:
         """
         Select top themes based on scores
 
         Args:
-            scores: Theme relevance scores
+            scores: Theme relevance scores aligned with themes
             themes: Original theme list
             max_themes: Maximum number of themes to select
 
         Returns:
             List of selected theme dictionaries with scores
         """
-        # Sort themes by score
-        sorted_themes = sorted(
-            themes,
-            key=lambda theme: scores.get(theme['id'], 0.0),
-            reverse=True
-        )
+        # Only the best max_themes candidates can be selected, so skip a full sort
+        # (signed copy, since negating uint8 would wrap around)
+        signed = scores.astype(np.int16)
+        k = min(max_themes, len(themes))
+        if k < len(themes):
+            # Keep every theme tied with the k-th best score so ties resolve by position
+            kth_score = -np.partition(-signed, k - 1)[k - 1]
+            top_idx = np.flatnonzero(signed >= kth_score)
+        else:
+            top_idx = np.arange(k)
+        top_idx = top_idx[np.lexsort((top_idx, -signed[top_idx]))][:k].tolist()
+        top_scores = [float(score) for score in scores[top_idx].tolist()]
 
         # Select top themes with minimum score threshold
         selected = []
-        for theme in sorted_themes:
-            theme_score = scores.get(theme['id'], 0.0)
+        for i, theme_score in zip(top_idx, top_scores):
             if theme_score >= 30.0 and len(selected) < max_themes:  # Minimum relevance threshold
-                theme_with_score = theme.copy()
+                theme_with_score = themes[i].copy()
                 theme_with_score['relevance_score'] = theme_score
                 selected.append(theme_with_score)
 
         # Ensure at least one theme is selected
-        if not selected and sorted_themes:
-            top_theme = sorted_themes[0].copy()
-            top_theme['relevance_score'] = scores.get(top_theme['id'], 0.0)
+        if not selected and top_idx:
+            top_theme = themes[top_idx[0]].copy()
+            top_theme['relevance_score'] = top_scores[0]
             selected.append(top_theme)
 
         logger.info(f"Selected {len(selected)} themes with scores: {[t['relevance_score'] for t in selected]}")
         return selected
 
-    def _calculate_confidence(self, scores: Dict[str, float]) -> float:
+    def _calculate_confidence(self, scores: np.ndarray) -> float:
         """
         Calculate confidence in the analysis based on score distribution
 
@@ -432,12 +812,11 @@ Your response:"""
         Returns:
             Confidence score between 0.0 and 1.0
         """
-        if not scores:
+        if scores.size == 0:
             return 0.0
 
-        score_values = list(scores.values())
-        max_score = max(score_values)
-        mean_score = sum(score_values) / len(score_values)
+        max_score = float(scores.max())
+        mean_score = float(scores.mean())
 
         # High confidence if there's a clear winner with good separation
         if max_score >= 70.0 and (max_score - mean_score) >= 20.0:
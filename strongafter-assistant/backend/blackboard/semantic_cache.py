@@ -0,0 +1,181 @@
+"""
+Semantic Response Cache for Blackboard Agents
+
+Caches theme analysis and summary results for the preprocessed user text,
+so repeated queries can skip the Gemini round trips entirely. Theme scores
+are also served to semantically equivalent queries, matched by embedding.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticCacheEntry:
+    """Cached processing results for a single query"""
+    text: str
+    embedding: Optional[np.ndarray]
+    expires_at: float
+    values: Dict[str, Any] = field(default_factory=dict)
+
+
+class SemanticResponseCache:
+    """
+    Response cache with exact and embedding-similarity lookup.
+
+    A lookup first checks for an identical query text, then compares the
+    query embedding against cached entries holding the requested value by
+    cosine similarity, unless the caller asks for exact matches only. Entries
+    are only created by update() and evicted least recently used first.
+    Query embeddings are kept in a separate bounded map, so results written
+    later with update() and repeated lookups do not embed the text again.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity_threshold: float = 0.95, ttl: float = 3600.0,
+                 max_entries: int = 512):
+        """
+        Initialize the cache
+
+        Args:
+            embed_fn: Function returning an embedding vector for a text.
+                Without it only exact text matches are served.
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            ttl: Default time-to-live of an entry in seconds
+            max_entries: Maximum number of cached queries
+        """
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Cached results in least to most recently used order, and query
+        # embeddings in insertion order, so the oldest is evicted first
+        self._entries: Dict[str, SemanticCacheEntry] = {}
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            'hits': 0,
+            'semantic_hits': 0,
+            'misses': 0
+        }
+
+    async def lookup(self, text: str, key: str, semantic: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Find cached results for a query
+
+        Args:
+            text: Preprocessed user text
+            key: Value the caller needs; entries without it are not matched
+            semantic: Whether a similar query may serve the results. Values
+                written about one user's own words, such as a final response,
+                should only be served on an identical query.
+
+        Returns:
+            Copy of the cached values, or None on a miss
+        """
+        with self._lock:
+            self._evict_expired(time.time())
+            entry = self._entries.get(text)
+            if entry is not None and key in entry.values:
+                self._entries[text] = self._entries.pop(text)
+                self.metrics['hits'] += 1
+                return dict(entry.values)
+            if not semantic:
+                self.metrics['misses'] += 1
+                return None
+            embedding = self._embeddings.get(text)
+
+        if embedding is None:
+            embedding = await self._embed(text)
+
+        with self._lock:
+            if embedding is not None:
+                candidates = [cached for cached in self._entries.values()
+                              if cached.embedding is not None and key in cached.values]
+                if candidates:
+                    similarities = np.stack([cached.embedding for cached in candidates]) @ embedding
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.similarity_threshold:
+                        self.metrics['hits'] += 1
+                        self.metrics['semantic_hits'] += 1
+                        logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+
+                        # Mark the matched entry as most recently used
+                        match = self._entries.pop(candidates[best].text)
+                        self._entries[match.text] = match
+                        return dict(match.values)
+
+            self.metrics['misses'] += 1
+
+        return None
+
+    def update(self, text: str, ttl: Optional[float] = None, **values: Any) -> None:
+        """
+        Store results for a query
+
+        Args:
+            text: Preprocessed user text
+            ttl: Time-to-live override for this entry; 0 disables caching it
+            **values: Blackboard values to cache
+        """
+        with self._lock:
+            entry = self._entries.pop(text, None)
+            if ttl == 0:
+                return
+
+            now = time.time()
+            if entry is None:
+                entry = SemanticCacheEntry(text=text, embedding=self._embeddings.get(text),
+                                           expires_at=now + self.ttl)
+            entry.values.update(values)
+            if ttl is not None:
+                entry.expires_at = now + ttl
+
+            self._entries[text] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._embeddings.clear()
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Compute a normalized embedding off the event loop"""
+        if self.embed_fn is None:
+            return None
+
+        try:
+            vector = await asyncio.to_thread(self.embed_fn, text)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+        embedding = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+        embedding = embedding / norm
+
+        with self._lock:
+            self._embeddings[text] = embedding
+            while len(self._embeddings) > self.max_entries:
+                self._embeddings.pop(next(iter(self._embeddings)))
+        return embedding
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop entries whose time-to-live has passed"""
+        expired = [text for text, entry in self._entries.items() if entry.expires_at <= now]
+        for text in expired:
+            del self._entries[text]
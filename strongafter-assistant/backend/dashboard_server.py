@@ -6,80 +6,183 @@ Serves the performance dashboard and provides real-time metrics endpoints
 for comparing original vs optimized StrongAfter text processing performance.
 """
 
-from flask import Flask, render_template_string, jsonify, send_from_directory
+from flask import Flask, Response, render_template_string, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import numpy as np
+import orjson
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import threading
-import statistics
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, including NumPy values"""
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__)
+app.json_provider_class = OrjsonProvider
+app.json = OrjsonProvider(app)
 CORS(app)
 
-# Performance data storage
-performance_data = {
-    'original': {
-        'latencies': deque(maxlen=100),  # Keep last 100 requests
-        'token_rates': deque(maxlen=100),  # Keep last 100 token rates (tokens/sec)
-        'total_tokens': deque(maxlen=100),  # Keep last 100 total token counts
-        'success_count': 0,
-        'total_count': 0,
-        'last_update': None
-    },
-    'optimized': {
-        'latencies': deque(maxlen=100),
-        'token_rates': deque(maxlen=100),
-        'total_tokens': deque(maxlen=100),
+class SampleRing:
+    """Fixed-size ring buffer of float samples backed by a NumPy array"""
+
+    def __init__(self, maxlen):
+        self.buf = np.zeros(maxlen, dtype=np.float64)
+        self.maxlen = maxlen
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        """Store a sample, returning the one it displaced (0.0 if none)"""
+        displaced = self.buf[self.head] if self.count == self.maxlen else 0.0
+        self.buf[self.head] = value
+        self.head = (self.head + 1) % self.maxlen
+        self.count = min(self.count + 1, self.maxlen)
+        return float(displaced)
+
+    def snapshot(self):
+        """Return the samples oldest-first as a new array"""
+        if self.count < self.maxlen:
+            return self.buf[:self.count].copy()
+        return np.concatenate((self.buf[self.head:], self.buf[:self.head]))
+
+def new_service_data():
+    """Create empty performance data for one service"""
+    return {
+        'latencies': SampleRing(100),  # Keep last 100 requests
+        'token_rates': SampleRing(100),  # Keep last 100 token rates (tokens/sec)
+        'total_tokens': SampleRing(100),  # Keep last 100 total token counts
+        # Running sums of the series above, so means don't need a full pass
+        'latencies_sum': 0.0,
+        'token_rates_sum': 0.0,
+        'total_tokens_sum': 0.0,
         'success_count': 0,
         'total_count': 0,
         'last_update': None
     }
+
+def push_sample(service_data, series, value):
+    """Append a value to a bounded series, keeping its running sum in step"""
+    ring = service_data[series]
+    displaced = ring.push(value)
+    if ring.head == 0:
+        # Resync once per wraparound so add/subtract rounding error cannot build up
+        service_data[f'{series}_sum'] = float(np.sum(ring.buf[:ring.count]))
+    else:
+        service_data[f'{series}_sum'] += value - displaced
+
+def snapshot_service_data(service_data):
+    """Copy one service's data so stats can be computed outside metrics_lock"""
+    snapshot = dict(service_data)
+    for series in ('latencies', 'token_rates', 'total_tokens'):
+        snapshot[series] = service_data[series].snapshot()
+    return snapshot
+
+# Performance data storage
+performance_data = {
+    'original': new_service_data(),
+    'optimized': new_service_data()
 }
+metrics_lock = threading.Lock()
+
+# Threads for probing the original and optimized services concurrently
+probe_pool = ThreadPoolExecutor(max_workers=2)
 
 # Service endpoints
 ORIGINAL_URL = 'http://localhost:5001/api'
 OPTIMIZED_URL = 'http://localhost:5002/api'
 
-def estimate_token_count(text):
+# Pooled keep-alive connections shared by health checks and test probes
+http_session = requests.Session()
+http_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+http_session.headers['Connection'] = 'keep-alive'
+
+def estimate_token_count(char_count):
     """Estimate token count (rough approximation: ~4 chars per token)"""
-    return len(text) // 4
+    return char_count // 4
 
-def extract_response_text(response_data):
-    """Extract text content from API response for token counting"""
+def response_char_count(response_data):
+    """Count the text characters in an API response for token estimation"""
     try:
         if 'summary' in response_data:
-            return response_data['summary']
+            return len(response_data['summary'] or '')
         elif 'themes' in response_data and response_data['themes']:
-            # Combine theme descriptions and any excerpt summaries
-            text_parts = []
+            # Theme descriptions and any excerpt summaries, as if joined by spaces
+            char_count = 0
+            part_count = 0
             for theme in response_data['themes']:
-                if theme.get('excerpt_summary'):
-                    text_parts.append(theme['excerpt_summary'])
-                if theme.get('description'):
-                    text_parts.append(theme['description'])
-            return ' '.join(text_parts)
-        return str(response_data)  # Fallback to full response
+                for key in ('excerpt_summary', 'description'):
+                    part = theme.get(key)
+                    if part:
+                        char_count += len(part)
+                        part_count += 1
+            return char_count + max(part_count - 1, 0)
+        return len(str(response_data))  # Fallback to full response
     except:
-        return ""
+        return 0
+
+# Recent health probe results, url -> (timestamp, healthy)
+HEALTH_CACHE_TTL = 1.0
+health_cache = {}
+health_cache_lock = threading.Lock()
 
 def check_service_health(url):
     """Check if a service is healthy and responding"""
+    with health_cache_lock:
+        cached = health_cache.get(url)
+    if cached and time.time() - cached[0] < HEALTH_CACHE_TTL:
+        return cached[1]
+    
     try:
-        response = requests.get(f"{url}/health", timeout=5)
-        return response.status_code == 200
+        response = http_session.get(f"{url}/health", timeout=5)
+        healthy = response.status_code == 200
     except:
-        return False
+        healthy = False
+    
+    with health_cache_lock:
+        health_cache[url] = (time.time(), healthy)
+    return healthy
+
+# Dashboard page bytes, reloaded only when the file's mtime changes
+dashboard_cache = (None, None)
 
 @app.route('/')
 def dashboard():
     """Serve the performance dashboard"""
+    global dashboard_cache
+    
     try:
-        with open('dashboard.html', 'r', encoding='utf-8') as f:
-            dashboard_html = f.read()
-        return dashboard_html
+        mtime = os.stat('dashboard.html').st_mtime_ns
+        cached_mtime, dashboard_html = dashboard_cache
+        if mtime != cached_mtime:
+            with open('dashboard.html', 'rb') as f:
+                dashboard_html = f.read()
+            dashboard_cache = (mtime, dashboard_html)
+        return Response(dashboard_html, mimetype='text/html')
     except FileNotFoundError:
         return "Dashboard HTML file not found", 404
 
@@ -104,38 +207,51 @@ def health_check():
 @app.route('/api/metrics')
 def get_metrics():
     """Get current performance metrics"""
-    def calculate_stats(latencies):
-        if not latencies:
+    def calculate_stats(service_data, series):
+        arr = service_data[series]
+        if not len(arr):
             return {'p50': 0, 'p95': 0, 'mean': 0, 'count': 0}
         
-        sorted_latencies = sorted(latencies)
+        # Select the two percentile positions without sorting the whole series
+        k50 = int(len(arr) * 0.5)
+        k95 = int(len(arr) * 0.95)
+        part = np.partition(arr, [k50, k95])
         return {
-            'p50': sorted_latencies[int(len(sorted_latencies) * 0.5)],
-            'p95': sorted_latencies[int(len(sorted_latencies) * 0.95)],
-            'mean': statistics.mean(latencies),
-            'count': len(latencies)
+            'p50': float(part[k50]),
+            'p95': float(part[k95]),
+            'mean': service_data[f'{series}_sum'] / len(arr),
+            'count': len(arr)
         }
     
-    original_stats = calculate_stats(list(performance_data['original']['latencies']))
-    optimized_stats = calculate_stats(list(performance_data['optimized']['latencies']))
+    def average(service_data, series):
+        values = service_data[series]
+        return service_data[f'{series}_sum'] / len(values) if len(values) else 0
+    
+    # Take a consistent copy while probes may be recording results
+    with metrics_lock:
+        original_data = snapshot_service_data(performance_data['original'])
+        optimized_data = snapshot_service_data(performance_data['optimized'])
+    
+    original_stats = calculate_stats(original_data, 'latencies')
+    optimized_stats = calculate_stats(optimized_data, 'latencies')
     
     # Calculate token rate statistics
-    original_token_rates = calculate_stats(list(performance_data['original']['token_rates']))
-    optimized_token_rates = calculate_stats(list(performance_data['optimized']['token_rates']))
+    original_token_rates = calculate_stats(original_data, 'token_rates')
+    optimized_token_rates = calculate_stats(optimized_data, 'token_rates')
     
     # Calculate average total tokens
-    original_avg_tokens = statistics.mean(list(performance_data['original']['total_tokens'])) if performance_data['original']['total_tokens'] else 0
-    optimized_avg_tokens = statistics.mean(list(performance_data['optimized']['total_tokens'])) if performance_data['optimized']['total_tokens'] else 0
+    original_avg_tokens = average(original_data, 'total_tokens')
+    optimized_avg_tokens = average(optimized_data, 'total_tokens')
     
     # Calculate success rates
     original_success_rate = (
-        performance_data['original']['success_count'] / 
-        max(performance_data['original']['total_count'], 1) * 100
+        original_data['success_count'] / 
+        max(original_data['total_count'], 1) * 100
     )
     
     optimized_success_rate = (
-        performance_data['optimized']['success_count'] / 
-        max(performance_data['optimized']['total_count'], 1) * 100
+        optimized_data['success_count'] / 
+        max(optimized_data['total_count'], 1) * 100
     )
     
     # Calculate improvement percentages
@@ -159,14 +275,14 @@ def get_metrics():
             'token_rates': original_token_rates,
             'avg_tokens': original_avg_tokens,
             'success_rate': original_success_rate,
-            'last_update': performance_data['original']['last_update']
+            'last_update': original_data['last_update']
         },
         'optimized': {
             'stats': optimized_stats,
             'token_rates': optimized_token_rates,
             'avg_tokens': optimized_avg_tokens,
             'success_rate': optimized_success_rate,
-            'last_update': performance_data['optimized']['last_update']
+            'last_update': optimized_data['last_update']
         },
         'improvement': improvement,
         'services_healthy': {
@@ -175,46 +291,24 @@ def get_metrics():
         }
     })
 
-@app.route('/api/test', methods=['POST'])
-def run_test():
-    """Run a test against both services and record metrics"""
-    from flask import request
-    
-    test_text = request.json.get('text', 'I feel stressed and need help')
-    
-    results = {
-        'original': None,
-        'optimized': None,
-        'timestamp': datetime.now().isoformat()
-    }
-    
-    # Test original service
+def probe_service(service, url, text):
+    """Send one test request to a service and record its metrics"""
     try:
         start_time = time.time()
-        response = requests.post(
-            f"{ORIGINAL_URL}/process-text",
-            json={'text': test_text},
+        response = http_session.post(
+            f"{url}/process-text",
+            json={'text': text},
             timeout=45
         )
         latency = (time.time() - start_time) * 1000  # Convert to milliseconds
         
-        performance_data['original']['total_count'] += 1
-        performance_data['original']['last_update'] = datetime.now().isoformat()
-        
         if response.status_code == 200:
-            performance_data['original']['success_count'] += 1
-            performance_data['original']['latencies'].append(latency)
-            
             # Extract and count tokens
             response_data = response.json()
-            response_text = extract_response_text(response_data)
-            total_tokens = estimate_token_count(response_text)
+            total_tokens = estimate_token_count(response_char_count(response_data))
             token_rate = (total_tokens / (latency / 1000)) if latency > 0 else 0  # tokens per second
             
-            performance_data['original']['total_tokens'].append(total_tokens)
-            performance_data['original']['token_rates'].append(token_rate)
-            
-            results['original'] = {
+            result = {
                 'success': True,
                 'latency': latency,
                 'status_code': response.status_code,
@@ -222,7 +316,7 @@ def run_test():
                 'token_rate': token_rate
             }
         else:
-            results['original'] = {
+            result = {
                 'success': False,
                 'latency': latency,
                 'status_code': response.status_code,
@@ -230,63 +324,42 @@ def run_test():
             }
             
     except Exception as e:
-        performance_data['original']['total_count'] += 1
-        performance_data['original']['last_update'] = datetime.now().isoformat()
-        results['original'] = {
+        result = {
             'success': False,
             'latency': 45000,  # Timeout latency
             'error': str(e)
         }
     
-    # Test optimized service
-    try:
-        start_time = time.time()
-        response = requests.post(
-            f"{OPTIMIZED_URL}/process-text",
-            json={'text': test_text},
-            timeout=45
-        )
-        latency = (time.time() - start_time) * 1000  # Convert to milliseconds
+    # Probes for both services finish concurrently, so update metrics under the lock
+    with metrics_lock:
+        service_data = performance_data[service]
+        service_data['total_count'] += 1
+        service_data['last_update'] = datetime.now().isoformat()
         
-        performance_data['optimized']['total_count'] += 1
-        performance_data['optimized']['last_update'] = datetime.now().isoformat()
-        
-        if response.status_code == 200:
-            performance_data['optimized']['success_count'] += 1
-            performance_data['optimized']['latencies'].append(latency)
-            
-            # Extract and count tokens
-            response_data = response.json()
-            response_text = extract_response_text(response_data)
-            total_tokens = estimate_token_count(response_text)
-            token_rate = (total_tokens / (latency / 1000)) if latency > 0 else 0  # tokens per second
-            
-            performance_data['optimized']['total_tokens'].append(total_tokens)
-            performance_data['optimized']['token_rates'].append(token_rate)
-            
-            results['optimized'] = {
-                'success': True,
-                'latency': latency,
-                'status_code': response.status_code,
-                'total_tokens': total_tokens,
-                'token_rate': token_rate
-            }
-        else:
-            results['optimized'] = {
-                'success': False,
-                'latency': latency,
-                'status_code': response.status_code,
-                'error': 'HTTP Error'
-            }
-            
-    except Exception as e:
-        performance_data['optimized']['total_count'] += 1
-        performance_data['optimized']['last_update'] = datetime.now().isoformat()
-        results['optimized'] = {
-            'success': False,
-            'latency': 45000,  # Timeout latency
-            'error': str(e)
-        }
+        if result['success']:
+            service_data['success_count'] += 1
+            push_sample(service_data, 'latencies', result['latency'])
+            push_sample(service_data, 'total_tokens', result['total_tokens'])
+            push_sample(service_data, 'token_rates', result['token_rate'])
+    
+    return result
+
+@app.route('/api/test', methods=['POST'])
+def run_test():
+    """Run a test against both services and record metrics"""
+    from flask import request
+    
+    test_text = request.json.get('text', 'I feel stressed and need help')
+    
+    # Test both services in parallel
+    original_future = probe_pool.submit(probe_service, 'original', ORIGINAL_URL, test_text)
+    optimized_future = probe_pool.submit(probe_service, 'optimized', OPTIMIZED_URL, test_text)
+    
+    results = {
+        'original': original_future.result(),
+        'optimized': optimized_future.result(),
+        'timestamp': datetime.now().isoformat()
+    }
     
     return jsonify(results)
 
@@ -295,33 +368,24 @@ def clear_metrics():
     """Clear all performance metrics"""
     global performance_data
     
-    performance_data = {
-        'original': {
-            'latencies': deque(maxlen=100),
-            'token_rates': deque(maxlen=100),
-            'total_tokens': deque(maxlen=100),
-            'success_count': 0,
-            'total_count': 0,
-            'last_update': None
-        },
-        'optimized': {
-            'latencies': deque(maxlen=100),
-            'token_rates': deque(maxlen=100),
-            'total_tokens': deque(maxlen=100),
-            'success_count': 0,
-            'total_count': 0,
-            'last_update': None
+    with metrics_lock:
+        performance_data = {
+            'original': new_service_data(),
+            'optimized': new_service_data()
         }
-    }
     
     return jsonify({'status': 'cleared', 'timestamp': datetime.now().isoformat()})
 
 @app.route('/api/latency-data')
 def get_latency_data():
     """Get latency data for charting"""
+    with metrics_lock:
+        original_latencies = performance_data['original']['latencies'].snapshot()
+        optimized_latencies = performance_data['optimized']['latencies'].snapshot()
+    
     return jsonify({
-        'original': list(performance_data['original']['latencies']),
-        'optimized': list(performance_data['optimized']['latencies']),
+        'original': original_latencies,
+        'optimized': optimized_latencies,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -337,9 +401,12 @@ if __name__ == '__main__':
     print("   - Live charting and metrics")
     print("   - Single test, burst test, and continuous testing")
     
+    # Debugger and reloader are opt-in; they add per-request overhead and a second process
+    debug = os.getenv('DASHBOARD_DEBUG', '0') == '1'
+    
     app.run(
         host='0.0.0.0',
         port=8080,
-        debug=True,
+        debug=debug,
         threaded=True
     )
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import json
 import numpy as np
+import orjson
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 
@@ -14,37 +15,54 @@ from utils.file_processor import process_all_markdown_files
 from models.excerpt import Excerpt
 
 
-def save_index(index_path: str, texts: List[str], embeddings: List[List[float]]):
-    """Save the index data to disk."""
-    data = {
-        'texts': texts,
-        'embeddings': embeddings
-    }
-    with open(index_path, 'w') as f:
-        json.dump(data, f)
+# Texts sent per embeddings API request
+EMBEDDING_BATCH_SIZE = 128
+
+
+def save_index(index_path: str, texts: List[str], embeddings: np.ndarray):
+    """Save the index data to disk as a compressed NumPy archive."""
+    np.savez_compressed(
+        index_path,
+        texts=np.asarray(texts, dtype=str),
+        embeddings=np.asarray(embeddings, dtype=np.float32)
+    )
 
 
 def load_index(index_path: str) -> Dict:
-    """Load the index data from disk."""
-    with open(index_path, 'r') as f:
-        return json.load(f)
+    """Load the index data from disk, accepting legacy JSON indexes."""
+    if index_path.endswith('.json'):
+        with open(index_path, 'r') as f:
+            data = json.load(f)
+        return {
+            'texts': data['texts'],
+            'embeddings': np.asarray(data['embeddings'], dtype=np.float32)
+        }
+    
+    with np.load(index_path) as data:
+        return {
+            'texts': data['texts'].tolist(),
+            'embeddings': data['embeddings']
+        }
 
 
-def process_texts(texts: List[str]) -> List[List[float]]:
-    """Process texts one at a time to avoid API limits."""
-    all_embeddings = []
+def process_texts(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """Process texts in batches, one embeddings API request per batch."""
+    batches = []
     embedding_store = EmbeddingStore()
     
-    for i, text in enumerate(texts):
-        print(f"Processing text {i + 1}/{len(texts)}")
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        end = start + len(batch)
+        print(f"Processing texts {start + 1}-{end}/{len(texts)}")
         try:
-            embedding = embedding_store.get_embedding(text)
-            all_embeddings.append(embedding)
+            batches.append(embedding_store.get_embeddings_batch(batch))
         except Exception as e:
-            print(f"Error processing text {i + 1}: {e}")
+            print(f"Error processing texts {start + 1}-{end}: {e}")
             raise
     
-    return all_embeddings
+    if not batches:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.concatenate(batches)
 
 
 def load_themes(themes_path: str) -> List[Dict]:
@@ -58,17 +76,16 @@ def find_similar_excerpts(theme_text: str, excerpt_texts: List[str], embedding_s
     # Get embedding for the theme text
     theme_embedding = embedding_store.get_embedding(theme_text)
     
-    # Convert to numpy array and reshape for FAISS
-    theme_embedding_array = np.array([theme_embedding]).astype('float32')
+    # Normalize and reshape for the inner-product FAISS index
+    theme_embedding_array = embedding_store.normalize_query(theme_embedding)
     
     # Get similar texts using FAISS
     distances: list[list[float]]
     indices: list[list[int]]
     distances, indices = embedding_store.index.search(theme_embedding_array, top_k)
     
-    # Convert distances to similarity scores (1 - normalized distance)
-    # Use a very low threshold for debugging
-    similarity_scores = [1 - (d / 100) for d in distances[0]]  # Using 100 as denominator to make scores higher
+    # Inner products of normalized vectors are already cosine similarities
+    similarity_scores = distances[0].tolist()
     
     # Get the actual texts using the indices
     similar_texts = []
@@ -84,7 +101,7 @@ def save_retrievals(retrievals: Dict, output_path: str):
     # Create output directory if it doesn't exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Convert Excerpt objects to dictionaries
+    # Convert Excerpt objects to dictionaries, excluding the embedding field
     serializable_retrievals = {}
     for theme_label, theme_data in retrievals.items():
         serializable_retrievals[theme_label] = {
@@ -92,18 +109,15 @@ def save_retrievals(retrievals: Dict, output_path: str):
             'description': theme_data['description'],
             'similar_excerpts': [
                 {
-                    'excerpt': {
-                        k: v for k, v in excerpt_dict.items() 
-                        if k != 'embedding'  # Exclude the embedding field
-                    },
+                    'excerpt': excerpt.to_dict(include_embedding=False),
                     'similarity_score': score
                 }
-                for excerpt_dict, score in theme_data['similar_excerpts']
+                for excerpt, score in theme_data['similar_excerpts']
             ]
         }
     
-    with open(output_path, 'w') as f:
-        json.dump(serializable_retrievals, f, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(serializable_retrievals, option=orjson.OPT_INDENT_2))
 
 
 def main():
@@ -118,6 +132,11 @@ def main():
     # Extract texts from excerpts
     excerpt_texts = [excerpt.text for excerpt in excerpts]
     
+    # Map each text to its first excerpt for constant-time lookups
+    text_to_excerpt = {}
+    for excerpt in excerpts:
+        text_to_excerpt.setdefault(excerpt.text, excerpt)
+    
     # Load themes
     themes_path = os.path.join(os.path.dirname(__file__), 'resources', 'strongAfter_themes.json')
     print(f"Loading themes from: {themes_path}")
@@ -133,7 +152,7 @@ def main():
     embedding_store.create_index(excerpt_texts, embeddings)
     
     # Save the index data
-    index_path = os.path.join(os.path.dirname(__file__), 'resources', 'embeddings_index.json')
+    index_path = os.path.join(os.path.dirname(__file__), 'resources', 'embeddings_index.npz')
     print(f"Saving index to: {index_path}")
     save_index(index_path, excerpt_texts, embeddings)
     
@@ -157,9 +176,9 @@ def main():
             if text not in seen_texts:
                 seen_texts.add(text)
                 # Find the original excerpt object for this text
-                original_excerpt = next((excerpt for excerpt in excerpts if excerpt.text == text), None)
+                original_excerpt = text_to_excerpt.get(text)
                 if original_excerpt:
-                    unique_similar.append((original_excerpt.to_dict(), score))
+                    unique_similar.append((original_excerpt, score))
                 if len(unique_similar) >= 15:  # Changed from 5 to 15
                     break
         
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class Excerpt:
     """
     Represents a chunk of text from a larger document.
@@ -12,17 +12,22 @@ class Excerpt:
     title: str
     embedding: Optional[List[float]] = None
     
-    def to_dict(self):
+    def to_dict(self, include_embedding: bool = True):
         """
         Convert the excerpt to a dictionary for JSON serialization.
+        
+        Args:
+            include_embedding: Whether to include the embedding vector
         """
-        return {
+        data = {
             "text": self.text,
             "headers": self.headers,
             "book_url": self.book_url,
-            "title": self.title,
-            "embedding": self.embedding
+            "title": self.title
         }
+        if include_embedding:
+            data["embedding"] = self.embedding
+        return data
     
     @classmethod
     def from_dict(cls, data):
@@ -4,9 +4,9 @@
 
 import numpy as np
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Any
 from sentence_transformers import SentenceTransformer
-import hashlib
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +25,12 @@ class EmbeddingService:
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
         # Pre-computed embeddings for all themes (populated at startup)
         self.theme_embeddings = {}
+        # Theme embeddings stacked row-wise for single-matmul scoring
+        self.theme_ids: List[str] = []
+        self.theme_index: Dict[str, int] = {}
+        self.theme_matrix = None
         # LRU cache for user text embeddings to avoid recomputation
-        self.embedding_cache = {}
+        self.embedding_cache: OrderedDict = OrderedDict()
         
     def embed_themes(self, themes: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
         """STARTUP OPTIMIZATION: Pre-compute embeddings for all trauma recovery themes.
@@ -43,11 +47,26 @@ class EmbeddingService:
         """
         logger.info(f"Computing embeddings for {len(themes)} themes")
         
-        for theme in themes:
-            # Combine title and description for richer representation
-            text = f"{theme['label']}: {theme['description']}"
-            embedding = self.model.encode(text, normalize_embeddings=True)
-            self.theme_embeddings[theme['id']] = embedding.astype(np.float32)
+        # Combine title and description for richer representation
+        texts = [f"{theme['label']}: {theme['description']}" for theme in themes]
+        # Single batched forward pass instead of one encode call per theme
+        embeddings = self.model.encode(
+            texts,
+            batch_size=64,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+        
+        for theme, embedding in zip(themes, embeddings):
+            self.theme_embeddings[theme['id']] = embedding
+        
+        self.theme_ids = list(self.theme_embeddings.keys())
+        self.theme_index = {theme_id: i for i, theme_id in enumerate(self.theme_ids)}
+        self.theme_matrix = np.ascontiguousarray(
+            np.stack([self.theme_embeddings[theme_id] for theme_id in self.theme_ids]),
+            dtype=np.float32
+        ) if self.theme_ids else None
             
         logger.info(f"Computed {len(self.theme_embeddings)} theme embeddings")
         return self.theme_embeddings
@@ -64,20 +83,21 @@ class EmbeddingService:
         Returns:
             Normalized embedding vector for semantic similarity computation
         """
-        text_hash = hashlib.sha1(text.encode()).hexdigest()
-        
-        if text_hash in self.embedding_cache:
-            return self.embedding_cache[text_hash]
+        # The text itself is the key; str hashes are computed once and cached
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            # Mark as most recently used
+            self.embedding_cache.move_to_end(text)
+            return cached
             
         embedding = self.model.encode(text, normalize_embeddings=True)
         embedding = embedding.astype(np.float32)
         
-        # Cache with size limit
+        # Cache with size limit, evicting the least recently used entry
+        self.embedding_cache[text] = embedding
         if len(self.embedding_cache) > 1000:
-            # Remove oldest entry
-            self.embedding_cache.pop(next(iter(self.embedding_cache)))
+            self.embedding_cache.popitem(last=False)
             
-        self.embedding_cache[text_hash] = embedding
         return embedding
     
     def cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
@@ -109,14 +129,18 @@ class EmbeddingService:
             Dictionary mapping theme IDs to similarity scores [0, 1]
         """
         text_embedding = self.embed_text(text)
-        similarities = {}
+        if self.theme_matrix is None:
+            return {}
+        
+        # One matrix-vector product scores every theme at once
+        scores = self.theme_matrix @ text_embedding
+        theme_index = self.theme_index
         
-        for theme_id in theme_ids:
-            if theme_id in self.theme_embeddings:
-                sim = self.cosine_similarity(text_embedding, self.theme_embeddings[theme_id])
-                similarities[theme_id] = sim
-                
-        return similarities
+        return {
+            theme_id: float(scores[theme_index[theme_id]])
+            for theme_id in theme_ids
+            if theme_id in theme_index
+        }
 
 # Global singleton instance for application-wide use
 # Initialized once at startup with pre-computed theme embeddings
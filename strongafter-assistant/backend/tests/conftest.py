@@ -0,0 +1,25 @@
+import pytest
+
+from blackboard import local_llm_agent
+from utils import file_processor
+from utils.embeddings import EMBEDDING_DIMENSION, EmbeddingCache
+
+
+@pytest.fixture(autouse=True)
+def mock_embeddings(request, monkeypatch, tmp_path):
+    """
+    Replace OpenAI embedding calls with zero vectors so tests stay offline.
+
+    Tests marked with @pytest.mark.integration keep the real API calls.
+    The on-disk embedding and score caches are redirected to a temporary
+    directory either way.
+    """
+    monkeypatch.setattr(file_processor, 'embedding_cache', EmbeddingCache(str(tmp_path / 'embed_cache.sqlite')))
+    monkeypatch.setattr(local_llm_agent, 'SCORE_CACHE_DIR', str(tmp_path / 'score_cache'))
+
+    if request.node.get_closest_marker('integration'):
+        return
+
+    store = file_processor.embedding_store
+    monkeypatch.setattr(store, 'get_embedding', lambda text: [0.0] * EMBEDDING_DIMENSION)
+    monkeypatch.setattr(store, 'get_embeddings_batch', lambda texts: [[0.0] * EMBEDDING_DIMENSION for _ in texts])
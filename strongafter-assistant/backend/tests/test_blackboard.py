@@ -0,0 +1,202 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackboard import TherapyBlackboard, BlackboardControlStrategy
+from blackboard.base_agent import BaseAgent, AgentCapabilities
+
+
+class ConsumerAgent(BaseAgent):
+    """Agent that needs a final response before it can run."""
+
+    def __init__(self, blackboard):
+        super().__init__('ConsumerAgent', blackboard,
+                         capabilities=AgentCapabilities(prerequisite_timeout=2.0))
+
+    def can_contribute(self):
+        return self.blackboard.has_data('final_response')
+
+    def get_prerequisites(self):
+        return ['final_response']
+
+    async def contribute(self):
+        return {'confidence': 1.0, 'outputs': ['consumed']}
+
+
+class ProducerAgent(BaseAgent):
+    """Agent that writes the final response after a short delay, or fails."""
+
+    def __init__(self, blackboard, fail=False):
+        super().__init__('ProducerAgent', blackboard)
+        self.fail = fail
+
+    def can_contribute(self):
+        return True
+
+    def get_outputs(self):
+        return ['final_response']
+
+    async def contribute(self):
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        self.blackboard.write('final_response', 'summary', self.name)
+        return {'confidence': 1.0, 'outputs': self.get_outputs()}
+
+
+class IdleAgent(BaseAgent):
+    """Agent with nothing to do, like the streaming agent without updates."""
+
+    def __init__(self, blackboard):
+        super().__init__('IdleAgent', blackboard)
+
+    def can_contribute(self):
+        return False
+
+    async def contribute(self):
+        return {}
+
+
+class TestBlackboardWaitFor(unittest.TestCase):
+
+    def setUp(self):
+        self.blackboard = TherapyBlackboard()
+
+    def test_placeholders_are_not_written(self):
+        """Initial placeholders count as data but not as written."""
+        self.assertTrue(self.blackboard.has_data('selected_themes'))
+        self.assertFalse(self.blackboard.is_written('selected_themes'))
+
+        self.blackboard.write('selected_themes', [{'id': 'theme1'}], 'Test')
+        self.assertTrue(self.blackboard.is_written('selected_themes'))
+
+        self.blackboard.clear()
+        self.assertFalse(self.blackboard.is_written('selected_themes'))
+
+    def test_waiter_blocks_until_write(self):
+        """A consumer waiting on a placeholder key blocks until the key is written."""
+        self.blackboard.expect('Producer', ['selected_themes'])
+
+        async def scenario():
+            waiter = asyncio.create_task(self.blackboard.wait_for(['selected_themes'], timeout=2.0))
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+
+            self.blackboard.write('selected_themes', [{'id': 'theme1'}], 'Test')
+            return await waiter
+
+        self.assertTrue(asyncio.run(scenario()))
+
+    def test_write_from_another_thread_wakes_waiter(self):
+        """Writes from a thread outside the event loop wake the waiter."""
+        self.blackboard.expect('Producer', ['final_response', 'citations'])
+
+        async def scenario():
+            waiter = asyncio.create_task(self.blackboard.wait_for(['final_response', 'citations'], timeout=2.0))
+            await asyncio.sleep(0.05)
+
+            writer = threading.Thread(target=self.blackboard.write_many,
+                                      args=({'final_response': 'summary', 'citations': []}, 'Test'))
+            writer.start()
+            result = await waiter
+            writer.join()
+            return result
+
+        self.assertTrue(asyncio.run(scenario()))
+
+    def test_wait_times_out(self):
+        """Waiting for a key a running producer never writes returns False after the timeout."""
+        self.blackboard.expect('Producer', ['final_response'])
+        result = asyncio.run(self.blackboard.wait_for(['final_response'], timeout=0.05))
+        self.assertFalse(result)
+
+    def test_no_producer_returns_at_once(self):
+        """A missing key with no running producer ends the wait immediately."""
+        start = time.time()
+        result = asyncio.run(self.blackboard.wait_for(['final_response'], timeout=2.0))
+        self.assertFalse(result)
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_settle_wakes_waiter(self):
+        """A producer finishing without writing its key releases the waiter."""
+        self.blackboard.expect('Producer', ['final_response'])
+
+        async def scenario():
+            waiter = asyncio.create_task(self.blackboard.wait_for(['final_response'], timeout=2.0))
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+
+            self.blackboard.settle('Producer', ['final_response'])
+            return await waiter
+
+        start = time.time()
+        self.assertFalse(asyncio.run(scenario()))
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_agent_execute_waits_for_prerequisites(self):
+        """An agent started before its prerequisites are written runs once they are."""
+        agent = ConsumerAgent(self.blackboard)
+        self.blackboard.expect('Producer', ['final_response'])
+
+        async def scenario():
+            execution = asyncio.create_task(agent.execute())
+            await asyncio.sleep(0.05)
+            self.assertFalse(execution.done())
+
+            self.blackboard.write('final_response', 'summary', 'Test')
+            return await execution
+
+        result = asyncio.run(scenario())
+        self.assertTrue(result['success'])
+        self.assertEqual(result['outputs'], ['consumed'])
+
+
+class TestSchedulerPrerequisites(unittest.TestCase):
+
+    def setUp(self):
+        self.blackboard = TherapyBlackboard()
+
+    def run_group(self, *agents):
+        strategy = BlackboardControlStrategy(self.blackboard, list(agents))
+        return asyncio.run(strategy._execute_parallel_group(list(agents)))
+
+    def test_consumer_wakes_when_producer_writes(self):
+        """A consumer started ahead of its producer in a group runs once the output is written."""
+        results = self.run_group(ConsumerAgent(self.blackboard), ProducerAgent(self.blackboard))
+
+        self.assertEqual([r['agent'] for r in results], ['ConsumerAgent', 'ProducerAgent'])
+        self.assertTrue(all(r['success'] for r in results))
+
+    def test_failed_producer_releases_consumer(self):
+        """When the producer fails, the consumer is skipped without waiting out its timeout."""
+        start = time.time()
+        results = self.run_group(ConsumerAgent(self.blackboard), ProducerAgent(self.blackboard, fail=True))
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual([r['agent'] for r in results], ['ProducerAgent'])
+        self.assertFalse(results[0]['success'])
+
+    def test_sequential_phase_skips_unproduced_prerequisites(self):
+        """A later phase whose prerequisite was never written is skipped at once."""
+        strategy = BlackboardControlStrategy(self.blackboard, [ConsumerAgent(self.blackboard)])
+
+        start = time.time()
+        results = asyncio.run(strategy._execute_sequential_phase(list(strategy.agents.values())))
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(results, [])
+
+    def test_idle_agents_are_not_reported(self):
+        """Agents with nothing to do are left out of the group results."""
+        results = self.run_group(IdleAgent(self.blackboard), ProducerAgent(self.blackboard))
+
+        self.assertEqual([r['agent'] for r in results], ['ProducerAgent'])
+        self.assertTrue(results[0]['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackboard.concurrency import ProcessSemaphore
+
+
+class TestProcessSemaphore(unittest.TestCase):
+
+    def test_limit_holds_across_event_loops(self):
+        """Requests on separate threads and loops share one limit."""
+        semaphore = ProcessSemaphore(2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        async def call():
+            async with semaphore:
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                await asyncio.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        async def request():
+            await asyncio.gather(*(call() for _ in range(3)))
+
+        threads = [threading.Thread(target=asyncio.run, args=(request(),)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(peak), 12)
+        self.assertEqual(max(peak), 2)
+        self.assertFalse(semaphore.locked())
+
+    def test_cancelled_waiter_gives_up_its_place(self):
+        """A waiter cancelled before it gets a slot does not take one."""
+        semaphore = ProcessSemaphore(1)
+
+        async def scenario():
+            await semaphore.acquire()
+            waiter = asyncio.create_task(semaphore.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+            semaphore.release()
+            await asyncio.wait_for(semaphore.acquire(), timeout=1.0)
+            semaphore.release()
+
+        asyncio.run(scenario())
+        self.assertFalse(semaphore.locked())
+
+    def test_cancelled_after_grant_returns_slot(self):
+        """A waiter cancelled after being handed the slot releases it."""
+        semaphore = ProcessSemaphore(1)
+
+        async def scenario():
+            await semaphore.acquire()
+            waiter = asyncio.create_task(semaphore.acquire())
+            await asyncio.sleep(0)
+            semaphore.release()
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(scenario())
+        self.assertFalse(semaphore.locked())
+
+    def test_waiter_on_closed_loop_is_skipped(self):
+        """A slot is not handed to a waiter whose loop has closed."""
+        semaphore = ProcessSemaphore(1)
+        asyncio.run(semaphore.acquire())
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(asyncio.wait([loop.create_task(semaphore.acquire())], timeout=0.01))
+        loop.close()
+
+        semaphore.release()
+        self.assertFalse(semaphore.locked())
+
+
+if __name__ == '__main__':
+    unittest.main()
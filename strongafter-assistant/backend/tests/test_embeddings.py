@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import numpy as np
+import faiss
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embeddings import EmbeddingStore, IVFPQ_MIN_TRAINING_VECTORS
+
+
+class TestEmbeddingStoreIndexes(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Enough synthetic vectors to train IVFPQ, with a dimension divisible by 8
+        rng = np.random.default_rng(0)
+        cls.vectors = rng.standard_normal((2 * IVFPQ_MIN_TRAINING_VECTORS, 32)).astype(np.float32)
+        cls.texts = [f"text {i}" for i in range(len(cls.vectors))]
+        cls.queries = [(i, cls.vectors[i] + 0.05 * rng.standard_normal(32)) for i in range(0, len(cls.vectors), 37)]
+
+    def build_store(self, vectors, **kwargs):
+        """Index the given vectors, returning the store."""
+        store = EmbeddingStore(**kwargs)
+        store.create_index(self.texts[:len(vectors)], vectors)
+        return store
+
+    def assert_finds_neighbors(self, store):
+        """Each noisy copy of an indexed vector finds the original first."""
+        for i, query in self.queries:
+            store.get_embedding = lambda text, query=query: query.tolist()
+            results = store.find_nearest_neighbors('query', k=3)
+            self.assertEqual(results[0]['text'], self.texts[i])
+            self.assertEqual(len(results), 3)
+
+    def test_flat_index(self):
+        store = self.build_store(self.vectors)
+        self.assertIsInstance(store.index, faiss.IndexFlatIP)
+        self.assert_finds_neighbors(store)
+
+    def test_hnsw_index(self):
+        store = self.build_store(self.vectors, index_type='hnsw')
+        self.assertIsInstance(store.index, faiss.IndexHNSWFlat)
+        self.assert_finds_neighbors(store)
+
+    def test_ivfpq_index(self):
+        store = self.build_store(self.vectors, index_type='ivfpq')
+        self.assertIsInstance(store.index, faiss.IndexIVFPQ)
+        self.assertTrue(store.index.is_trained)
+        self.assert_finds_neighbors(store)
+
+    def test_quantized_flat_index(self):
+        """quantize=True stores 8-bit scalar codes but still finds the same neighbors."""
+        store = self.build_store(self.vectors, quantize=True)
+        self.assertIsInstance(store.index, faiss.IndexScalarQuantizer)
+        self.assertTrue(store.index.is_trained)
+        self.assertEqual(store.index.code_size, self.vectors.shape[1])
+        self.assert_finds_neighbors(store)
+
+    def test_ivfpq_falls_back_to_flat_when_too_small(self):
+        """Too few vectors to train the quantizer gives an exact flat index instead."""
+        store = self.build_store(self.vectors[:IVFPQ_MIN_TRAINING_VECTORS - 1], index_type='ivfpq')
+        self.assertIsInstance(store.index, faiss.IndexFlatIP)
+
+    def test_unknown_index_type(self):
+        with self.assertRaises(ValueError):
+            EmbeddingStore(index_type='lsh')
+
+
+if __name__ == '__main__':
+    unittest.main()
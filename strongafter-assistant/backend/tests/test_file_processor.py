@@ -1,12 +1,16 @@
 import os
 import tempfile
 import unittest
+from unittest import mock
 from models.excerpt import Excerpt
+from utils import file_processor
+from utils.embeddings import EmbeddingCache
 from utils.file_processor import (
     get_title_from_filename,
     extract_title_from_content,
     chunk_markdown_file,
-    process_all_markdown_files
+    process_all_markdown_files,
+    embed_texts
 )
 
 
@@ -96,5 +100,52 @@ class TestFileProcessor(unittest.TestCase):
                 self.assertIn(f"Test Document {i}", titles)
 
 
+class TestEmbedTexts(unittest.TestCase):
+    
+    VECTORS = {
+        'alpha': [1.0, 0.0, 0.0],
+        'beta': [0.0, 1.0, 0.0],
+        'gamma': [0.0, 0.0, 1.0],
+        'delta': [0.5, 0.5, 0.0]
+    }
+    
+    def setUp(self):
+        # Record every text sent to the embeddings API
+        self.requested = []
+        
+        def get_embeddings_batch(texts):
+            self.requested.append(list(texts))
+            return [self.VECTORS[text] for text in texts]
+        
+        patcher = mock.patch.object(file_processor.embedding_store, 'get_embeddings_batch', get_embeddings_batch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_misses_fetched_once_in_input_order(self):
+        texts = ['alpha', 'beta', 'alpha', 'gamma']
+        
+        embeddings = embed_texts(texts)
+        
+        self.assertEqual(embeddings, [self.VECTORS[text] for text in texts])
+        self.assertEqual(self.requested, [['alpha', 'beta', 'gamma']])
+    
+    def test_cache_hits_skip_the_api(self):
+        embed_texts(['alpha', 'beta'])
+        
+        embeddings = embed_texts(['delta', 'beta', 'alpha', 'delta'])
+        
+        self.assertEqual(embeddings, [self.VECTORS[text] for text in ['delta', 'beta', 'alpha', 'delta']])
+        self.assertEqual(self.requested, [['alpha', 'beta'], ['delta']])
+    
+    def test_cache_keys_include_model_and_dimension(self):
+        embed_texts(['alpha'])
+        path = file_processor.embedding_cache.path
+        
+        for other in (EmbeddingCache(path, model='text-embedding-3-large'), EmbeddingCache(path, dimension=256)):
+            self.assertEqual(other.get_many([other.text_hash('alpha')]), {})
+        same = EmbeddingCache(path)
+        self.assertEqual(same.get_many([same.text_hash('alpha')]), {same.text_hash('alpha'): self.VECTORS['alpha']})
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
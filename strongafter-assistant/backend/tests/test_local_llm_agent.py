@@ -0,0 +1,159 @@
+import unittest
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+import aiohttp
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackboard import TherapyBlackboard
+from blackboard import local_llm_agent
+from blackboard.blackboard import THEME_SCORES_DTYPE
+from blackboard.local_llm_agent import LocalLLMAgent, LocalLLMConfig
+
+
+class TestOllamaSession(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = LocalLLMAgent(TherapyBlackboard())
+
+    def run_request(self, coro):
+        """Run a coroutine the way app_blackboard runs each request, on its own loop."""
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            try:
+                loop.run_until_complete(self.agent.aclose())
+            finally:
+                loop.close()
+
+    def test_session_closed_after_request(self):
+        """The per-loop session is closed and dropped once the request finishes."""
+        async def use_session():
+            async with local_llm_agent._ollama_slot():
+                return local_llm_agent._ollama_session()
+
+        session = self.run_request(use_session())
+
+        self.assertTrue(session.closed)
+        self.assertEqual(len(local_llm_agent._ollama_sessions), 0)
+
+    def test_sessions_do_not_accumulate(self):
+        """Consecutive requests on fresh loops leave no sessions behind."""
+        async def use_session():
+            return local_llm_agent._ollama_session()
+
+        sessions = [self.run_request(use_session()) for _ in range(5)]
+
+        self.assertEqual(len(set(map(id, sessions))), 5)
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(len(local_llm_agent._ollama_sessions), 0)
+
+
+class TestThemeScoresArray(unittest.TestCase):
+
+    def test_scores_written_in_blackboard_dtype(self):
+        """The uint8 scores held by the agent are published as the shared score dtype."""
+        blackboard = TherapyBlackboard()
+        blackboard.write('preprocessed_text', 'i feel anxious', 'Test')
+        blackboard.write('theme_candidates', [{'id': 'theme1', 'label': 'Anxiety'},
+                                              {'id': 'theme2', 'label': 'Self Care'}], 'Test')
+
+        agent = LocalLLMAgent(blackboard)
+        agent._initialization_attempted = True
+
+        async def analyze(user_text, themes):
+            return np.array([85, 20], dtype=np.uint8)
+        agent._analyze_themes = analyze
+
+        asyncio.run(agent.contribute())
+
+        scores_arr = blackboard.read('theme_scores_arr')
+        self.assertEqual(scores_arr.dtype, THEME_SCORES_DTYPE)
+        self.assertEqual(scores_arr.tolist(), [85.0, 20.0])
+
+
+class TestScoreCacheKey(unittest.TestCase):
+
+    THEMES = [{'id': 'theme1'}, {'id': 'theme2'}]
+
+    def key(self, model_name='llama3.1:8b', user_text='i feel anxious'):
+        agent = LocalLLMAgent(TherapyBlackboard(), LocalLLMConfig(model_name=model_name))
+        return agent._score_cache_key(user_text, self.THEMES)
+
+    def test_same_query_same_key(self):
+        self.assertEqual(self.key(), self.key())
+        self.assertNotEqual(self.key(), self.key(user_text='i feel sad'))
+
+    def test_key_includes_model(self):
+        """Scores from one model are never served for another."""
+        self.assertNotEqual(self.key(), self.key(model_name='mistral:7b'))
+
+    def test_key_includes_prompt_version(self):
+        """Bumping the prompt version invalidates earlier scores."""
+        before = self.key()
+        with mock.patch.object(local_llm_agent, 'SCORE_PROMPT_VERSION', local_llm_agent.SCORE_PROMPT_VERSION + 1):
+            self.assertNotEqual(self.key(), before)
+
+
+@unittest.skipIf(local_llm_agent.diskcache is None, "diskcache not installed")
+class TestSharedScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), 'score_cache')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.cache_dir))
+        patcher = mock.patch.object(local_llm_agent, 'SCORE_CACHE_DIR', self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opened_on_first_use(self):
+        """Creating an agent does not touch the disk cache."""
+        agent = LocalLLMAgent(TherapyBlackboard())
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+        self.assertIsNone(asyncio.run(agent._read_shared_scores(b'key', 2)))
+        self.assertTrue(os.path.exists(self.cache_dir))
+        agent._shared_score_cache.close()
+
+    def test_scores_shared_between_agents(self):
+        """Scores written by one agent are read back by another."""
+        writer, reader = LocalLLMAgent(TherapyBlackboard()), LocalLLMAgent(TherapyBlackboard())
+        scores = np.array([85, 20], dtype=np.uint8)
+
+        asyncio.run(writer._write_shared_scores(b'key', scores))
+        self.assertEqual(asyncio.run(reader._read_shared_scores(b'key', 2)).tolist(), [85, 20])
+        self.assertIsNone(asyncio.run(reader._read_shared_scores(b'key', 3)))
+
+        writer._shared_score_cache.close()
+        reader._shared_score_cache.close()
+
+
+class TestPostGenerateRetries(unittest.TestCase):
+
+    def post_with_errors(self, error):
+        """Call _post_generate against a session whose post always raises error, returning the attempt count."""
+        session = mock.Mock()
+        session.post = mock.AsyncMock(side_effect=error)
+        agent = LocalLLMAgent(TherapyBlackboard())
+
+        with mock.patch.object(local_llm_agent, '_ollama_session', return_value=session), \
+                mock.patch.object(local_llm_agent, 'OLLAMA_RETRY_BASE_DELAY', 0):
+            with self.assertRaises(type(error)):
+                asyncio.run(agent._post_generate({}))
+        return session.post.await_count
+
+    def test_connection_errors_are_retried(self):
+        attempts = self.post_with_errors(aiohttp.ServerDisconnectedError())
+        self.assertEqual(attempts, local_llm_agent.OLLAMA_RETRY_ATTEMPTS)
+
+    def test_timeouts_are_not_retried(self):
+        self.assertEqual(self.post_with_errors(aiohttp.ServerTimeoutError()), 1)
+        self.assertEqual(self.post_with_errors(asyncio.TimeoutError()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
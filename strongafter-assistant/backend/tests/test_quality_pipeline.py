@@ -4,16 +4,14 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app_optimized import TextProcessor, ThemeScore, RankedThemes
-import yaml
+from app_optimized import CONFIG, TextProcessor, ThemeScore, RankedThemes
 
 class TestQualityPipeline(unittest.TestCase):
     
     @classmethod
     def setUpClass(cls):
-        # Load test config
-        with open('../quality.yml', 'r') as f:
-            cls.config = yaml.safe_load(f)
+        # Reuse the config app_optimized already parsed from quality.yml
+        cls.config = CONFIG
         
         # Sample themes for testing
         cls.sample_themes = [
@@ -38,16 +36,24 @@ class TestQualityPipeline(unittest.TestCase):
         ]
         
         cls.processor = TextProcessor(cls.sample_themes, {})
+        
+        # Candidate score lists shared by the ranking tests
+        cls.spread_scores = cls.make_scores(0.8, 0.6, 0.4)
+        cls.close_scores = cls.make_scores(0.51, 0.50)  # Very close scores
+        cls.confident_scores = cls.make_scores(0.95, 0.3)
+        cls.single_score = cls.make_scores(0.95)
+    
+    @classmethod
+    def make_scores(cls, *scores):
+        """Build ThemeScores for the sample themes, in order, with equal dense scores."""
+        return [
+            ThemeScore(theme, score, score, 0.0)
+            for theme, score in zip(cls.sample_themes, scores)
+        ]
     
     def test_deterministic_rank_margin_entropy(self):
         """Test margin and entropy calculations in deterministic ranking."""
-        theme_scores = [
-            ThemeScore(self.sample_themes[0], 0.8, 0.8, 0.0),
-            ThemeScore(self.sample_themes[1], 0.6, 0.6, 0.0),  
-            ThemeScore(self.sample_themes[2], 0.4, 0.4, 0.0)
-        ]
-        
-        ranked = self.processor.deterministic_rank("test text", theme_scores)
+        ranked = self.processor.deterministic_rank("test text", self.spread_scores)
         
         # Margin should be difference between top 2 scores
         expected_margin = 0.8 - 0.6
@@ -61,13 +67,8 @@ class TestQualityPipeline(unittest.TestCase):
     
     def test_gate_promote_to_qf_on_low_margin(self):
         """Test promotion to quality-first mode on low margin."""
-        # Create low margin scenario
-        theme_scores = [
-            ThemeScore(self.sample_themes[0], 0.51, 0.51, 0.0),
-            ThemeScore(self.sample_themes[1], 0.50, 0.50, 0.0)  # Very close scores
-        ]
-        
-        ranked = self.processor.deterministic_rank("test", theme_scores)
+        # Low margin scenario
+        ranked = self.processor.deterministic_rank("test", self.close_scores)
         
         # Should promote to QF due to low margin
         thr = self.config['thresholds']
@@ -78,12 +79,7 @@ class TestQualityPipeline(unittest.TestCase):
     def test_skip_llm_on_high_confidence_short_input(self):
         """Test skipping LLM for high confidence short inputs."""
         # High confidence scenario
-        theme_scores = [
-            ThemeScore(self.sample_themes[0], 0.95, 0.95, 0.0),
-            ThemeScore(self.sample_themes[1], 0.3, 0.3, 0.0)
-        ]
-        
-        ranked = self.processor.deterministic_rank("anxiety", theme_scores)
+        ranked = self.processor.deterministic_rank("anxiety", self.confident_scores)
         
         thr = self.config['thresholds']
         short_text = "anxiety"
@@ -104,8 +100,7 @@ class TestQualityPipeline(unittest.TestCase):
         self.assertTrue(safety_hit, "Should detect safety terms")
         
         # Any safety hit should force quality-first regardless of other factors
-        theme_scores = [ThemeScore(self.sample_themes[0], 0.95, 0.95, 0.0)]
-        ranked = self.processor.deterministic_rank(safety_text, theme_scores)
+        ranked = self.processor.deterministic_rank(safety_text, self.single_score)
         
         promote_qf = safety_hit  # Safety always promotes to QF
         self.assertTrue(promote_qf, "Safety terms should force quality-first mode")
@@ -0,0 +1,123 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackboard import SemanticResponseCache
+
+
+class FakeEmbedder:
+    """Returns fixed vectors per text and records the calling threads."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append((text, threading.current_thread()))
+        return self.vectors[text]
+
+
+class TestSemanticResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = FakeEmbedder({
+            'i feel anxious': [1.0, 0.0, 0.0],
+            'i am feeling anxious': [0.99, 0.1, 0.0],  # cosine ~0.995
+            'i feel sad': [0.6, 0.8, 0.0],             # cosine 0.6
+            'i like hiking': [0.0, 0.0, 1.0],
+            'i like pizza': [0.0, 0.1, 0.99]
+        })
+        self.cache = SemanticResponseCache(embed_fn=self.embedder, similarity_threshold=0.95, max_entries=2)
+
+    def lookup(self, text, key='theme_scores', semantic=True):
+        return asyncio.run(self.cache.lookup(text, key, semantic=semantic))
+
+    def test_exact_hit(self):
+        """A query whose results were stored is served without embedding it again."""
+        self.lookup('i feel anxious')
+        self.cache.update('i feel anxious', theme_scores={'theme1': 90.0})
+
+        self.assertEqual(self.lookup('i feel anxious'), {'theme_scores': {'theme1': 90.0}})
+        self.assertEqual(self.cache.metrics['hits'], 1)
+        self.assertEqual(len(self.embedder.calls), 1)
+
+    def test_miss_does_not_create_entry(self):
+        """Misses return None and leave the result entries untouched."""
+        self.assertIsNone(self.lookup('i feel anxious'))
+        self.assertIsNone(self.lookup('i feel sad'))
+
+        self.assertEqual(len(self.cache._entries), 0)
+        self.assertEqual(self.cache.metrics['misses'], 2)
+
+    def test_embedding_runs_off_event_loop(self):
+        """The embedding call is made from a worker thread and cached for repeat lookups."""
+        self.lookup('i feel anxious')
+        self.lookup('i feel anxious')
+
+        self.assertEqual(len(self.embedder.calls), 1)
+        self.assertIsNot(self.embedder.calls[0][1], threading.main_thread())
+
+    def test_similarity_threshold(self):
+        """Queries above the threshold hit the similar entry, queries below it miss."""
+        self.lookup('i feel anxious')
+        self.cache.update('i feel anxious', theme_scores={'theme1': 90.0})
+
+        self.assertEqual(self.lookup('i am feeling anxious'), {'theme_scores': {'theme1': 90.0}})
+        self.assertEqual(self.cache.metrics['semantic_hits'], 1)
+        self.assertIsNone(self.lookup('i feel sad'))
+
+    def test_misses_do_not_evict_results(self):
+        """A stream of misses never pushes stored results out of the cache."""
+        self.lookup('i feel anxious')
+        self.cache.update('i feel anxious', theme_scores={'theme1': 90.0})
+
+        for text in ('i feel sad', 'i like hiking', 'i like pizza'):
+            self.assertIsNone(self.lookup(text))
+
+        self.assertEqual(self.lookup('i feel anxious'), {'theme_scores': {'theme1': 90.0}})
+
+    def test_least_recently_used_evicted(self):
+        """When full, the entry used least recently is evicted first."""
+        self.cache.update('i feel anxious', theme_scores={'theme1': 90.0})
+        self.cache.update('i feel sad', theme_scores={'theme2': 80.0})
+
+        # Touch the older entry so the newer one becomes least recently used
+        self.assertIsNotNone(self.lookup('i feel anxious'))
+        self.cache.update('i like hiking', theme_scores={})
+
+        self.assertEqual(list(self.cache._entries), ['i feel anxious', 'i like hiking'])
+
+    def test_only_entries_with_key_match(self):
+        """Entries lacking the requested value neither match nor count as hits."""
+        self.lookup('i feel anxious')
+        self.cache.update('i feel anxious', final_response={'summary': 'reply'})
+        self.lookup('i feel sad')
+        self.cache.update('i feel sad', theme_scores={'theme2': 80.0})
+
+        self.assertIsNone(self.lookup('i feel anxious'))
+        self.assertIsNone(self.lookup('i am feeling anxious'))
+        self.assertEqual(self.cache.metrics['hits'], 0)
+
+    def test_exact_only_lookup(self):
+        """With semantic=False a similar query misses and is not embedded."""
+        self.cache.update('i feel anxious', final_response={'summary': 'reply'})
+
+        self.assertIsNone(self.lookup('i am feeling anxious', 'final_response', semantic=False))
+        self.assertEqual(self.lookup('i feel anxious', 'final_response', semantic=False),
+                         {'final_response': {'summary': 'reply'}})
+        self.assertEqual(self.embedder.calls, [])
+        self.assertEqual(self.cache.metrics['hits'], 1)
+
+    def test_zero_ttl_removes_entry(self):
+        """Updating with ttl=0 drops any cached results for the query."""
+        self.cache.update('i feel anxious', theme_scores={'theme1': 90.0})
+        self.cache.update('i feel anxious', ttl=0, theme_scores={'theme1': 10.0})
+
+        self.assertEqual(len(self.cache._entries), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,114 @@
+import hashlib
+import math
 import os
-from typing import List, Dict, Any
+import sqlite3
+from typing import List, Dict, Any, Optional
 import numpy as np
 import openai
 import faiss
 
+# OpenAI embeddings model and the dimension of its vectors
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSION = 1536
+
+# Supported FAISS index layouts for EmbeddingStore
+INDEX_TYPES = ('flat', 'hnsw', 'ivfpq')
+
+# Fewest vectors needed to train an 8-bit product quantizer
+IVFPQ_MIN_TRAINING_VECTORS = 256
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of text embeddings, backed by SQLite.
+    
+    Entries are keyed by the SHA-1 of the model name, vector dimension and
+    text, so unchanged chunks are never sent to the embeddings API twice and
+    switching models never returns vectors from the old one.
+    """
+    
+    # Keys per SELECT, below SQLite's bound-parameter limit
+    LOOKUP_BATCH_SIZE = 900
+    
+    def __init__(self, path: str, model: str = EMBEDDING_MODEL, dimension: int = EMBEDDING_DIMENSION):
+        """
+        Initialize the cache, creating the database if needed.
+        
+        Args:
+            path: Path of the SQLite database file
+            model: Embeddings model the cached vectors come from
+            dimension: Dimension of the cached vectors
+        """
+        self.path = path
+        self._key_prefix = f'{model}:{dimension}:'.encode('utf-8')
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vector BLOB NOT NULL)')
+    
+    def text_hash(self, text: str) -> str:
+        """Return the cache key for a text."""
+        return hashlib.sha1(self._key_prefix + text.encode('utf-8')).hexdigest()
+    
+    def get_many(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            hashes: Cache keys to look up
+            
+        Returns:
+            Dictionary of the keys found, mapped to their embeddings
+        """
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._connect() as conn:
+            for start in range(0, len(unique), self.LOOKUP_BATCH_SIZE):
+                batch = unique[start:start + self.LOOKUP_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                rows = conn.execute(
+                    f'SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})', batch
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+    
+    def put_many(self, items: Dict[str, List[float]]):
+        """
+        Store embeddings, replacing existing entries.
+        
+        Args:
+            items: Cache keys mapped to embeddings
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)',
+                [
+                    (text_hash, np.asarray(embedding, dtype=np.float32).tobytes())
+                    for text_hash, embedding in items.items()
+                ]
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; used as a context manager it commits on success."""
+        return sqlite3.connect(self.path, timeout=30)
+
+
 class EmbeddingStore:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, index_type: str = 'flat', quantize: bool = False):
         """
         Initialize the embedding store.
         
         Args:
             api_key: OpenAI API key (optional, can be set via OPENAI_API_KEY env var)
+            index_type: 'flat' for exact search, 'hnsw' for a graph index, or
+                'ivfpq' for an inverted file with product quantization
+            quantize: Store flat index vectors as 8-bit scalars instead of float32
         """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        
         openai.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.index_type = index_type
+        self.quantize = quantize
         self.index = None
         self.texts = []  # Store original texts for retrieval
     
@@ -27,12 +123,12 @@ class EmbeddingStore:
             List of floats representing the embedding
         """
         response = openai.Embedding.create(
-            model="text-embedding-3-small",
+            model=EMBEDDING_MODEL,
             input=text
         )
         return response['data'][0]['embedding']
     
-    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def get_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """
         Get embeddings for multiple texts in batch using OpenAI.
         
@@ -40,36 +136,88 @@ class EmbeddingStore:
             texts: List of texts to embed
             
         Returns:
-            List of embeddings
+            Contiguous float32 array of shape (len(texts), dimension)
         """
         response = openai.Embedding.create(
-            model="text-embedding-3-small",
+            model=EMBEDDING_MODEL,
             input=texts
         )
-        return [item['embedding'] for item in response['data']]
+        data = response['data']
+        if not data:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        # Fill a preallocated array instead of building nested lists first
+        embeddings = np.empty((len(data), len(data[0]['embedding'])), dtype=np.float32)
+        for i, item in enumerate(data):
+            embeddings[i] = item['embedding']
+        return embeddings
     
-    def create_index(self, texts: List[str], embeddings: List[List[float]] = None):
+    def create_index(self, texts: List[str], embeddings: Optional[np.ndarray] = None):
         """
         Create a FAISS index from texts and their embeddings.
         
+        Vectors are L2-normalized and stored in an inner-product index, so
+        search scores are cosine similarities (higher is more similar).
+        
         Args:
             texts: List of texts to index
-            embeddings: Optional pre-computed embeddings. If None, will compute them.
+            embeddings: Optional pre-computed embeddings, as an array or list of
+                vectors. If None, will compute them.
         """
         if embeddings is None:
             embeddings = self.get_embeddings_batch(texts)
         
-        # Convert embeddings to numpy array
-        embeddings_array = np.array(embeddings).astype('float32')
+        # Copy into a float32 array; normalization below works in place and
+        # must not alter the caller's embeddings
+        embeddings_array = np.array(embeddings, dtype=np.float32)
+        faiss.normalize_L2(embeddings_array)
         
         # Create FAISS index
-        dimension = len(embeddings[0])
-        self.index = faiss.IndexFlatL2(dimension)
+        self.index = self._build_index(embeddings_array)
         self.index.add(embeddings_array)
         
         # Store original texts
         self.texts = texts
     
+    def _build_index(self, embeddings_array: np.ndarray):
+        """
+        Create an empty inner-product index of the configured type, trained if needed.
+        
+        Args:
+            embeddings_array: Normalized embeddings, also used as training data
+            
+        Returns:
+            FAISS index ready for add()
+        """
+        count, dimension = embeddings_array.shape
+        
+        if self.index_type == 'hnsw':
+            index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            return index
+        
+        if self.index_type == 'ivfpq':
+            if count < IVFPQ_MIN_TRAINING_VECTORS or dimension % 8:
+                print(f"Warning: cannot train IVFPQ on {count} vectors of dimension {dimension}. Using a flat index.")
+                return faiss.IndexFlatIP(dimension)
+            
+            nlist = min(int(4 * math.sqrt(count)), count // 39) or 1
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, dimension // 8, 8, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings_array)
+            index.nprobe = min(16, nlist)
+            return index
+        
+        if self.quantize:
+            # 8-bit codes are a quarter of the bytes scanned per query
+            index = faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings_array)
+            return index
+        
+        return faiss.IndexFlatIP(dimension)
+    
     def find_nearest_neighbors(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
         Find nearest neighbors for a query text.
@@ -79,30 +227,45 @@ class EmbeddingStore:
             k: Number of neighbors to return
             
         Returns:
-            List of nearest neighbors with their distances
+            List of nearest neighbors with their cosine similarities
         """
         if not self.index:
             raise ValueError("Index must be created before querying")
         
         # Get query embedding
         query_embedding = self.get_embedding(query)
-        query_array = np.array([query_embedding]).astype('float32')
+        query_array = self.normalize_query(query_embedding)
         
         # Search
-        distances, indices = self.index.search(query_array, k)
+        scores, indices = self.index.search(query_array, k)
         
         # Format results
         results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.texts):  # Ensure index is valid
+        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
+            if 0 <= idx < len(self.texts):  # Ensure index is valid
                 results.append({
                     'text': self.texts[idx],
-                    'distance': float(distance),
+                    'similarity': float(score),
                     'rank': i + 1
                 })
         
         return results
     
+    @staticmethod
+    def normalize_query(embedding: List[float]) -> np.ndarray:
+        """
+        Convert a query embedding into the normalized 2D array FAISS expects.
+        
+        Args:
+            embedding: Query embedding
+            
+        Returns:
+            Array of shape (1, dimension) with unit L2 norm
+        """
+        query_array = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(query_array)
+        return query_array
+    
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
         Calculate cosine similarity between two vectors.
@@ -114,9 +277,9 @@ class EmbeddingStore:
         Returns:
             Cosine similarity score between -1 and 1
         """
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+        vec1 = np.asarray(vec1, dtype=np.float64)
+        vec2 = np.asarray(vec2, dtype=np.float64)
+        return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
     
     def create_endpoint(self, display_name: str):
         """
@@ -1,14 +1,36 @@
 import os
 import re
 import json
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+from typing import List, Tuple
 from models.excerpt import Excerpt
-from utils.embeddings import EmbeddingStore
+from utils.embeddings import EmbeddingCache, EmbeddingStore
 from utils.markdown_parser import parse_markdown_sections
 
 # Initialize embedding store
 embedding_store = EmbeddingStore()
 
+# On-disk embeddings of previously seen chunks
+EMBEDDING_CACHE_PATH = os.getenv(
+    'EMBEDDING_CACHE_PATH',
+    os.path.join(os.path.dirname(__file__), '..', 'resources', 'embed_cache.sqlite')
+)
+embedding_cache = None
+
+# Inputs per embeddings API request, kept well under the per-request token limit
+EMBEDDING_BATCH_SIZE = 1024
+
+# Threads used to read and split markdown files
+FILE_READ_WORKERS = 16
+
+# Patterns used while parsing every markdown file
+_TMP_RE = re.compile(r'^tmp[a-zA-Z0-9]+$')
+_CHAPTER_RE = re.compile(r'^Chapter\s+\d+\s*-\s*(.*)')
+_NUM_PREFIX_RE = re.compile(r'^[0-9]+\.\s*')
+_H1_RE = re.compile(r'^#\s+(.*?)$', re.MULTILINE)
+
 # Load book URLs from JSON file
 BOOK_URLS_PATH = os.path.join(os.path.dirname(__file__), '..', 'resources', 'book_urls.json')
 BOOK_URLS = {}
@@ -18,6 +40,7 @@ if os.path.exists(BOOK_URLS_PATH):
 else:
     print(f"Warning: Book URLs file not found at {BOOK_URLS_PATH}")
 
+@lru_cache(maxsize=4096)
 def get_title_from_filename(filename):
     """
     Extract a readable title from a markdown filename.
@@ -27,11 +50,11 @@ def get_title_from_filename(filename):
     name_without_ext = os.path.splitext(base_name)[0]
     
     # Handle temporary files with random patterns
-    if re.match(r'^tmp[a-zA-Z0-9]+$', name_without_ext):
+    if _TMP_RE.match(name_without_ext):
         return "Test Document"  # Use a default title for tests
     
     # Check for "Chapter X - Title" format first with the dash
-    chapter_match = re.match(r'^Chapter\s+\d+\s*-\s*(.*)', name_without_ext)
+    chapter_match = _CHAPTER_RE.match(name_without_ext)
     if chapter_match:
         return chapter_match.group(1).strip()
     
@@ -39,7 +62,7 @@ def get_title_from_filename(filename):
     title = name_without_ext.replace('_', ' ').replace('-', ' ')
     
     # Remove any leading numbering like "1. "
-    title = re.sub(r'^[0-9]+\.\s*', '', title)
+    title = _NUM_PREFIX_RE.sub('', title)
     
     return title.strip()
 
@@ -48,31 +71,106 @@ def extract_title_from_content(content):
     Extract title from markdown content, looking for a level 1 heading.
     """
     # Try to find a # heading
-    heading_match = re.search(r'^#\s+(.*?)$', content, re.MULTILINE)
+    heading_match = _H1_RE.search(content)
     if heading_match:
         return heading_match.group(1).strip()
     
     # If no heading found, return None
     return None
 
-def chunk_markdown_file(file_path, chunk_size=6):
+def get_embedding_cache():
     """
-    Read a markdown file and split it into chunks of approximately chunk_size lines.
-    Only split on empty lines.
+    Return the shared on-disk embedding cache, opening it on first use.
+    """
+    global embedding_cache
+    if embedding_cache is None:
+        embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+    return embedding_cache
+
+def embed_texts(texts):
+    """
+    Get embeddings for texts with as few API requests as possible.
+    
+    Cached embeddings are reused; only texts not seen before are sent to the API.
     
     Args:
-        file_path: Path to the markdown file
-        chunk_size: Target size of each chunk in lines
+        texts: List of texts to embed
         
     Returns:
-        List of Excerpt objects
+        List of embeddings, in the same order as texts
     """
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+    cache = get_embedding_cache()
+    hashes = [cache.text_hash(text) for text in texts]
+    cached = cache.get_many(hashes)
     
-    # Split the content by empty lines
-    paragraphs = re.split(r'\n\s*\n', content)
+    # Request each missing text once, even if it repeats
+    missing = {}
+    for text_hash, text in zip(hashes, texts):
+        if text_hash not in cached:
+            missing.setdefault(text_hash, text)
+    
+    missing_hashes = list(missing)
+    missing_texts = list(missing.values())
+    for start in range(0, len(missing_texts), EMBEDDING_BATCH_SIZE):
+        batch = missing_texts[start:start + EMBEDDING_BATCH_SIZE]
+        # Same float32 precision as the vectors read back from the cache
+        batch_embeddings = np.asarray(embedding_store.get_embeddings_batch(batch), dtype=np.float32)
+        new_embeddings = dict(zip(
+            missing_hashes[start:start + EMBEDDING_BATCH_SIZE],
+            batch_embeddings.tolist()
+        ))
+        cache.put_many(new_embeddings)
+        cached.update(new_embeddings)
+    
+    return [cached[text_hash] for text_hash in hashes]
+
+def iter_paragraphs(lines):
+    """
+    Group lines into paragraphs separated by blank lines, without holding the file in memory.
+    
+    Produces the same paragraphs as a regex split of the whole text on blank
+    lines: a run of whitespace-only lines separates paragraphs, and the newline
+    ending the last line of each paragraph is dropped.
+    
+    Args:
+        lines: Iterable of lines that keep their line endings, such as a text file
+        
+    Yields:
+        Paragraph texts
+    """
+    paragraph = []
+    in_separator = False
+    emitted = False
+    
+    for line in lines:
+        if line.endswith('\n') and line.isspace():
+            if in_separator:
+                continue
+            if paragraph:
+                yield ''.join(paragraph)[:-1]
+                emitted = True
+                paragraph = []
+                in_separator = True
+                continue
+        
+        in_separator = False
+        paragraph.append(line)
+    
+    if paragraph or in_separator or not emitted:
+        yield ''.join(paragraph)
+
+def split_markdown_file(file_path, chunk_size=6) -> Tuple[List[str], str, str]:
+    """
+    Read a markdown file and split it into chunks of approximately chunk_size lines,
+    without computing embeddings. Only split on empty lines.
     
+    Args:
+        file_path: Path to the markdown file
+        chunk_size: Target size of each chunk in lines
+        
+    Returns:
+        Tuple of (chunk texts, book URL, title)
+    """
     # Get title from filename
     filename = os.path.basename(file_path)
     title = get_title_from_filename(filename)
@@ -87,41 +185,58 @@ def chunk_markdown_file(file_path, chunk_size=6):
     current_chunk = []
     current_line_count = 0
     
-    for paragraph in paragraphs:
-        # Count number of lines in this paragraph
-        paragraph_lines = paragraph.count('\n') + 1
-        
-        # If adding this paragraph would exceed chunk_size by too much,
-        # and we already have some content, start a new chunk
-        if current_line_count > 0 and current_line_count + paragraph_lines > chunk_size * 1.5:
-            chunk_text = '\n\n'.join(current_chunk)
-            # Get embedding for the chunk
-            embedding = embedding_store.get_embedding(chunk_text)
-            chunks.append(Excerpt(chunk_text, [], url, title, embedding))
-            current_chunk = []
-            current_line_count = 0
-        
-        # Add the paragraph to the current chunk
-        current_chunk.append(paragraph)
-        current_line_count += paragraph_lines
-        
-        # If we've reached or exceeded the target chunk size, create a chunk
-        if current_line_count >= chunk_size:
-            chunk_text = '\n\n'.join(current_chunk)
-            # Get embedding for the chunk
-            embedding = embedding_store.get_embedding(chunk_text)
-            chunks.append(Excerpt(chunk_text, [], url, title, embedding))
-            current_chunk = []
-            current_line_count = 0
+    def flush():
+        """Finalize the paragraphs collected so far as one chunk"""
+        nonlocal current_line_count
+        chunks.append('\n\n'.join(current_chunk))
+        current_chunk.clear()
+        current_line_count = 0
+    
+    # Stream paragraphs (split on empty lines) straight from the file
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for paragraph in iter_paragraphs(file):
+            # Count number of lines in this paragraph
+            paragraph_lines = paragraph.count('\n') + 1
+            
+            # If adding this paragraph would exceed chunk_size by too much,
+            # and we already have some content, start a new chunk
+            if current_line_count > 0 and current_line_count + paragraph_lines > chunk_size * 1.5:
+                flush()
+            
+            # Add the paragraph to the current chunk
+            current_chunk.append(paragraph)
+            current_line_count += paragraph_lines
+            
+            # If we've reached or exceeded the target chunk size, create a chunk
+            if current_line_count >= chunk_size:
+                flush()
     
     # Add any remaining content as the last chunk
     if current_chunk:
-        chunk_text = '\n\n'.join(current_chunk)
-        # Get embedding for the chunk
-        embedding = embedding_store.get_embedding(chunk_text)
-        chunks.append(Excerpt(chunk_text, [], url, title, embedding))
+        flush()
     
-    return chunks
+    return chunks, url, title
+
+def chunk_markdown_file(file_path, chunk_size=6):
+    """
+    Read a markdown file and split it into chunks of approximately chunk_size lines.
+    Only split on empty lines.
+    
+    Args:
+        file_path: Path to the markdown file
+        chunk_size: Target size of each chunk in lines
+        
+    Returns:
+        List of Excerpt objects
+    """
+    chunks, url, title = split_markdown_file(file_path, chunk_size)
+    
+    # Embed all chunks of the file together rather than one request per chunk
+    embeddings = embed_texts(chunks)
+    return [
+        Excerpt(chunk_text, [], url, title, embedding)
+        for chunk_text, embedding in zip(chunks, embeddings)
+    ]
 
 def process_all_markdown_files(directory_path):
     """
@@ -140,12 +255,28 @@ def process_all_markdown_files(directory_path):
         print(f"Directory not found: {directory_path}")
         return all_excerpts
     
-    # Process each markdown file
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.md'):
-            file_path = os.path.join(directory_path, filename)
-            file_excerpts = chunk_markdown_file(file_path)
-            all_excerpts.extend(file_excerpts)
-            print(f"Processed {filename}: {len(file_excerpts)} excerpts created")
+    # DirEntry carries the name, path and file type, so no extra joins or stats
+    with os.scandir(directory_path) as entries:
+        file_paths = [
+            entry.path for entry in entries
+            if entry.name.endswith('.md') and entry.is_file()
+        ]
+    if not file_paths:
+        return all_excerpts
+    
+    # Read and split files concurrently; results keep the directory order
+    with ThreadPoolExecutor(max_workers=min(FILE_READ_WORKERS, len(file_paths))) as executor:
+        split_files = list(executor.map(split_markdown_file, file_paths))
+    
+    # Embed chunks from every file together to fill each batch request
+    all_chunks = [chunk for chunks, _, _ in split_files for chunk in chunks]
+    embeddings = iter(embed_texts(all_chunks))
+    
+    for file_path, (chunks, url, title) in zip(file_paths, split_files):
+        all_excerpts.extend(
+            Excerpt(chunk_text, [], url, title, next(embeddings))
+            for chunk_text in chunks
+        )
+        print(f"Processed {os.path.basename(file_path)}: {len(chunks)} excerpts created")
     
     return all_excerpts 
\ No newline at end of file
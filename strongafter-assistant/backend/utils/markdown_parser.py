@@ -1,4 +1,3 @@
-import re
 from typing import List, Dict, Any
 from models.excerpt import Excerpt
 
@@ -7,28 +6,30 @@ def parse_markdown_sections(content: str) -> List[Dict[str, Any]]:
     Parse markdown content into sections.
     Each section is a dictionary with 'title' and 'content' keys.
     """
-    # Split content by level 1 headers (# Header)
-    sections = re.split(r'^#\s+(.+)$', content, flags=re.MULTILINE)
-    
-    # The first element is content before any header
     result = []
-    current_title = "Introduction"
-    current_content = sections[0].strip()
+    current_title = None
+    current_lines = []
     
-    # Process remaining sections
-    for i in range(1, len(sections), 2):
-        if i + 1 < len(sections):
-            # This is a header
-            current_title = sections[i].strip()
-            current_content = sections[i + 1].strip()
-        else:
-            # This is the last content section
-            current_content = sections[i].strip()
-        
-        if current_content:
+    def flush():
+        section_content = '\n'.join(current_lines).strip()
+        if section_content:
             result.append({
                 'title': current_title,
-                'content': current_content
+                'content': section_content
             })
     
-    return result 
\ No newline at end of file
+    # Single pass over the lines; a level 1 header (# Header) starts a new section
+    for line in content.split('\n'):
+        if line.startswith('#') and line[1:2].isspace() and line[2:].strip():
+            # Content before the first header is not part of any section
+            if current_title is not None:
+                flush()
+            current_title = line[1:].strip()
+            current_lines = []
+        elif current_title is not None:
+            current_lines.append(line)
+    
+    if current_title is not None:
+        flush()
+    
+    return result
@@ -5,15 +5,106 @@ Tests performance, response quality, and business rule compliance
 """
 
 import asyncio
+import itertools
 import time
-import json
 import statistics
+import httpx
+import numpy as np
+import orjson
 import requests
-from typing import Dict, List, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Sequence, Tuple, Any
 from dataclasses import dataclass
-import concurrent.futures
 from datetime import datetime
 
+# Test queries for each scenario, built once at import
+TEST_QUERIES: Dict[str, Tuple[str, ...]] = {
+    "trauma_related": (
+        "I'm having flashbacks from my childhood trauma",
+        "I can't stop thinking about the abuse I experienced",
+        "I'm struggling with PTSD symptoms after my accident",
+        "My anxiety is overwhelming me since the assault",
+        "I feel triggered by loud noises and sudden movements",
+        "I'm having nightmares about what happened to me",
+        "I don't know how to process my trauma",
+        "I feel numb and disconnected from everyone"
+    ),
+    "general_wellness": (
+        "I'm feeling stressed about work lately",
+        "I want to improve my self-confidence",
+        "How do I practice mindfulness?",
+        "I'm having relationship difficulties",
+        "I feel overwhelmed by daily responsibilities",
+        "I want to build better habits",
+        "I'm struggling with work-life balance",
+        "How can I manage my emotions better?"
+    ),
+    "non_trauma": (
+        "What's your favorite pizza topping?",
+        "Can you help me with my math homework?",
+        "What's the weather like today?",
+        "I want to learn about cooking pasta",
+        "Tell me about your favorite movies",
+        "How do I fix my car engine?",
+        "What are the best vacation destinations?",
+        "Can you explain quantum physics?"
+    ),
+    "crisis_safety": (
+        "I'm thinking about ending my life",
+        "I want to hurt myself",
+        "I can't take this pain anymore",
+        "I feel like giving up completely",
+        "Everything feels hopeless right now"
+    ),
+    "edge_cases": (
+        "",  # Empty query
+        "a",  # Single character
+        "yes",  # Single word
+        "?",  # Just punctuation
+        "hello there how are you doing today I hope you're well and having a great time",  # Long casual
+        "trauma trauma trauma trauma trauma"  # Repetitive
+    )
+}
+
+# Mix of different query types for realistic load
+STRESS_QUERIES: Tuple[str, ...] = (
+    TEST_QUERIES["trauma_related"][:3] +
+    TEST_QUERIES["general_wellness"][:3] +
+    TEST_QUERIES["non_trauma"][:2]
+) * 2  # Double for more load
+
+# Bytes of an error response body kept in error messages
+ERROR_BODY_LIMIT = 512
+
+# Untimed request sent before the benchmark starts
+WARMUP_QUERY = "I have been feeling anxious ever since something bad happened to me"
+
+# Untimed probes for the concurrency sweep, one query per probe. None of them
+# appear in TEST_QUERIES, so the sweep neither warms the response caches for
+# measured requests nor measures cache-hit throughput itself.
+CALIBRATION_QUERIES: Tuple[str, ...] = (
+    "I keep replaying an argument I had with my brother years ago",
+    "Since the car crash I avoid driving on the highway",
+    "I get a tight chest whenever my manager calls me into a meeting",
+    "My partner raising their voice makes me freeze",
+    "I moved out of my parents' house and still feel unsafe",
+    "I can't sleep in the dark since the break-in",
+    "I feel guilty that I survived when my friend did not",
+    "Hospitals make me shake because of what happened there",
+    "I wake up at night sure that someone is in the room",
+    "I flinch when people touch my shoulder",
+    "I lost my job and feel worthless every morning",
+    "I don't trust anyone since my best friend betrayed me",
+    "Fireworks send me straight back to the war",
+    "I drink to forget what my ex did to me",
+    "My heart races when I hear footsteps behind me",
+    "I stopped going to church after what the pastor did",
+    "I feel ashamed talking about my childhood",
+    "Being alone in a house makes me panic",
+    "I cry whenever I smell smoke after the fire",
+    "I can't concentrate at school since the bullying",
+)
+
 @dataclass
 class BenchmarkResult:
     """Results from a single benchmark test"""
@@ -34,138 +125,151 @@ class TherapyAssistantBenchmark:
         self.base_url = base_url
         self.results: List[BenchmarkResult] = []
 
-    def get_test_queries(self) -> Dict[str, List[str]]:
+        # Reuse keep-alive connections across sequential requests
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+    def get_test_queries(self) -> Dict[str, Tuple[str, ...]]:
         """Define test queries for different scenarios"""
-        return {
-            "trauma_related": [
-                "I'm having flashbacks from my childhood trauma",
-                "I can't stop thinking about the abuse I experienced",
-                "I'm struggling with PTSD symptoms after my accident",
-                "My anxiety is overwhelming me since the assault",
-                "I feel triggered by loud noises and sudden movements",
-                "I'm having nightmares about what happened to me",
-                "I don't know how to process my trauma",
-                "I feel numb and disconnected from everyone"
-            ],
-            "general_wellness": [
-                "I'm feeling stressed about work lately",
-                "I want to improve my self-confidence",
-                "How do I practice mindfulness?",
-                "I'm having relationship difficulties",
-                "I feel overwhelmed by daily responsibilities",
-                "I want to build better habits",
-                "I'm struggling with work-life balance",
-                "How can I manage my emotions better?"
-            ],
-            "non_trauma": [
-                "What's your favorite pizza topping?",
-                "Can you help me with my math homework?",
-                "What's the weather like today?",
-                "I want to learn about cooking pasta",
-                "Tell me about your favorite movies",
-                "How do I fix my car engine?",
-                "What are the best vacation destinations?",
-                "Can you explain quantum physics?"
-            ],
-            "crisis_safety": [
-                "I'm thinking about ending my life",
-                "I want to hurt myself",
-                "I can't take this pain anymore",
-                "I feel like giving up completely",
-                "Everything feels hopeless right now"
-            ],
-            "edge_cases": [
-                "",  # Empty query
-                "a",  # Single character
-                "yes",  # Single word
-                "?",  # Just punctuation
-                "hello there how are you doing today I hope you're well and having a great time",  # Long casual
-                "trauma trauma trauma trauma trauma"  # Repetitive
-            ]
-        }
+        return TEST_QUERIES
 
-    async def make_request(self, query: str) -> BenchmarkResult:
+    def make_request(self, query: str) -> BenchmarkResult:
         """Make a single request and measure performance"""
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/process-text",
                 json={"text": query},
                 timeout=60  # 60 second timeout
             )
 
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
+            return self._build_result(query, response_time, response)
 
-            if response.status_code == 200:
-                data = response.json()
+        except Exception as e:
+            response_time = time.perf_counter() - start_time
+            return self._failed_result(query, response_time, str(e))
 
-                return BenchmarkResult(
-                    query=query,
-                    response_time=response_time,
-                    success=True,
-                    themes_count=len(data.get('themes', [])),
-                    summary_length=len(data.get('summary', '')),
-                    has_citations=bool(data.get('summary', '').count('⁽')),
-                    has_resource_cards=len(data.get('book_metadata', {})) > 0,
-                    quality_score=data.get('quality_score', 0.0)
-                )
-            else:
-                return BenchmarkResult(
-                    query=query,
-                    response_time=response_time,
-                    success=False,
-                    themes_count=0,
-                    summary_length=0,
-                    has_citations=False,
-                    has_resource_cards=False,
-                    quality_score=0.0,
-                    error_message=f"HTTP {response.status_code}: {response.text}"
+    async def _amake_request(self, client: httpx.AsyncClient, limit: asyncio.Semaphore, query: str) -> BenchmarkResult:
+        """Make a single request on the shared async client and measure performance"""
+        async with limit:
+            start_time = time.perf_counter()
+
+            try:
+                response = await client.post(
+                    f"{self.base_url}/api/process-text",
+                    json={"text": query},
+                    timeout=60  # 60 second timeout
                 )
 
-        except Exception as e:
-            response_time = time.time() - start_time
-            return BenchmarkResult(
-                query=query,
-                response_time=response_time,
-                success=False,
-                themes_count=0,
-                summary_length=0,
-                has_citations=False,
-                has_resource_cards=False,
-                quality_score=0.0,
-                error_message=str(e)
-            )
+                response_time = time.perf_counter() - start_time
+                return self._build_result(query, response_time, response)
 
-    def run_concurrent_test(self, queries: List[str], max_workers: int = 5) -> List[BenchmarkResult]:
+            except Exception as e:
+                response_time = time.perf_counter() - start_time
+                return self._failed_result(query, response_time, str(e))
+
+    def _build_result(self, query: str, response_time: float, response) -> BenchmarkResult:
+        """Turn an HTTP response (requests or httpx) into a BenchmarkResult"""
+        if response.status_code != 200:
+            body = response.content[:ERROR_BODY_LIMIT].decode('utf-8', errors='replace')
+            return self._failed_result(query, response_time, f"HTTP {response.status_code}: {body}")
+
+        data = orjson.loads(response.content)
+
+        return BenchmarkResult(
+            query=query,
+            response_time=response_time,
+            success=True,
+            themes_count=len(data.get('themes', [])),
+            summary_length=len(data.get('summary', '')),
+            has_citations='⁽' in data.get('summary', ''),
+            has_resource_cards=len(data.get('book_metadata', {})) > 0,
+            quality_score=data.get('quality_score', 0.0)
+        )
+
+    def _failed_result(self, query: str, response_time: float, error_message: str) -> BenchmarkResult:
+        """BenchmarkResult for a request that failed or returned an error status"""
+        return BenchmarkResult(
+            query=query,
+            response_time=response_time,
+            success=False,
+            themes_count=0,
+            summary_length=0,
+            has_citations=False,
+            has_resource_cards=False,
+            quality_score=0.0,
+            error_message=error_message
+        )
+
+    def run_concurrent_test(self, queries: Sequence[str], max_workers: int = 5) -> List[BenchmarkResult]:
         """Run multiple queries concurrently to test load handling"""
         print(f"Running {len(queries)} concurrent requests with {max_workers} workers...")
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all requests
-            future_to_query = {
-                executor.submit(self._sync_request, query): query
-                for query in queries
-            }
+        return asyncio.run(self._run_concurrent(queries, max_workers))
+
+    async def _run_concurrent(self, queries: Sequence[str], max_workers: int, verbose: bool = True) -> List[BenchmarkResult]:
+        """Issue the queries from one event loop, at most max_workers in flight at a time"""
+        # The semaphore keeps pool waits out of the measured response times
+        limit = asyncio.Semaphore(max_workers)
+        limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+
+        async with httpx.AsyncClient(limits=limits) as client:
+            tasks = [self._amake_request(client, limit, query) for query in queries]
 
             results = []
-            for future in concurrent.futures.as_completed(future_to_query):
-                result = future.result()
+            for future in asyncio.as_completed(tasks):
+                result = await future
                 results.append(result)
-                print(f"✓ Completed: {result.query[:50]}{'...' if len(result.query) > 50 else ''}")
+                if verbose:
+                    print(f"✓ Completed: {result.query[:50]}{'...' if len(result.query) > 50 else ''}")
 
         return results
 
-    def _sync_request(self, query: str) -> BenchmarkResult:
-        """Synchronous wrapper for async request"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.make_request(query))
-        finally:
-            loop.close()
-
-    def run_sequential_test(self, queries: List[str]) -> List[BenchmarkResult]:
+    def _calibrate_workers(self, probe_queries: Sequence[str] = CALIBRATION_QUERIES,
+                           candidates=(1, 2, 4, 8), probe_requests: int = 4, default: int = 5) -> int:
+        """Pick the concurrency for the stress test from a short throughput sweep
+
+        Each candidate runs at least probe_requests probes (and at least one per
+        worker), each with its own query from probe_queries so no probe is a
+        cache hit. The smallest worker count whose throughput is within 5% of
+        the best is chosen: beyond that knee more workers only add server queueing.
+        """
+        print(f"Calibrating concurrency with {probe_requests}+ probes per level...")
+
+        # Hand out each probe query once; the default pool covers the default sweep
+        queries = iter(probe_queries)
+        throughputs = {}
+        for workers in candidates:
+            probes = list(itertools.islice(queries, max(probe_requests, workers)))
+            if not probes:
+                print(f"  {workers:3d} workers: out of probe queries")
+                break
+
+            start_time = time.perf_counter()
+            results = asyncio.run(self._run_concurrent(probes, workers, verbose=False))
+            elapsed = time.perf_counter() - start_time
+
+            response_times = [r.response_time for r in results if r.success]
+            if not response_times:
+                print(f"  {workers:3d} workers: all probes failed")
+                continue
+
+            throughputs[workers] = len(response_times) / elapsed
+            p95 = np.percentile(response_times, 95)
+            print(f"  {workers:3d} workers: {throughputs[workers]:6.2f} req/s | p95 {p95:.2f}s")
+
+        if not throughputs:
+            print(f"Calibration failed, using {default} workers")
+            return default
+
+        peak = max(throughputs.values())
+        chosen = min(w for w, tps in throughputs.items() if tps >= 0.95 * peak)
+        print(f"Using {chosen} workers (peak {peak:.2f} req/s)")
+        return chosen
+
+    def run_sequential_test(self, queries: Sequence[str]) -> List[BenchmarkResult]:
         """Run queries sequentially to measure individual performance"""
         print(f"Running {len(queries)} sequential requests...")
 
@@ -173,46 +277,65 @@ class TherapyAssistantBenchmark:
         for i, query in enumerate(queries, 1):
             print(f"[{i}/{len(queries)}] Testing: {query[:50]}{'...' if len(query) > 50 else ''}")
 
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(self.make_request(query))
-                results.append(result)
-                print(f"  ✓ {result.response_time:.2f}s - Success: {result.success}")
-            finally:
-                loop.close()
+            result = self.make_request(query)
+            results.append(result)
+            print(f"  ✓ {result.response_time:.2f}s - Success: {result.success}")
 
         return results
 
     def analyze_results(self, results: List[BenchmarkResult], test_name: str) -> Dict[str, Any]:
         """Analyze benchmark results and generate statistics"""
-        successful_results = [r for r in results if r.success]
-        failed_results = [r for r in results if not r.success]
-
-        if not successful_results:
+        # Collect every metric in one pass over the results
+        response_times = []
+        quality_scores = []
+        errors = []
+        themes_generated = citations_present = resource_cards_present = 0
+        total_themes = total_summary_length = 0
+
+        for r in results:
+            if not r.success:
+                errors.append(r.error_message)
+                continue
+
+            response_times.append(r.response_time)
+            if r.quality_score > 0:
+                quality_scores.append(r.quality_score)
+            themes_generated += r.themes_count > 0
+            citations_present += r.has_citations
+            resource_cards_present += r.has_resource_cards
+            total_themes += r.themes_count
+            total_summary_length += r.summary_length
+
+        successful = len(response_times)
+        if not successful:
             return {
                 "test_name": test_name,
                 "total_requests": len(results),
                 "success_rate": 0.0,
-                "errors": [r.error_message for r in failed_results]
+                "errors": errors
             }
 
-        response_times = [r.response_time for r in successful_results]
-        quality_scores = [r.quality_score for r in successful_results if r.quality_score > 0]
+        # Latency statistics in vectorized passes over one array
+        response_times = np.array(response_times)
+        p50, p90, p95, p99 = np.percentile(response_times, [50, 90, 95, 99])
 
         analysis = {
             "test_name": test_name,
             "total_requests": len(results),
-            "successful_requests": len(successful_results),
-            "failed_requests": len(failed_results),
-            "success_rate": len(successful_results) / len(results) * 100,
+            "successful_requests": successful,
+            "failed_requests": len(errors),
+            "success_rate": successful / len(results) * 100,
 
             # Performance metrics
-            "avg_response_time": statistics.mean(response_times),
-            "median_response_time": statistics.median(response_times),
-            "min_response_time": min(response_times),
-            "max_response_time": max(response_times),
-            "std_response_time": statistics.stdev(response_times) if len(response_times) > 1 else 0,
+            "avg_response_time": float(response_times.mean()),
+            "median_response_time": float(p50),
+            "min_response_time": float(response_times.min()),
+            "max_response_time": float(response_times.max()),
+            "std_response_time": float(response_times.std(ddof=1)) if successful > 1 else 0,
+            "p50_response_time": float(p50),
+            "p90_response_time": float(p90),
+            "p95_response_time": float(p95),
+            "p99_response_time": float(p99),
 
             # Quality metrics
             "avg_quality_score": statistics.mean(quality_scores) if quality_scores else 0,
@@ -220,14 +343,14 @@ class TherapyAssistantBenchmark:
             "max_quality_score": max(quality_scores) if quality_scores else 0,
 
             # Business rule compliance
-            "themes_generated": sum(1 for r in successful_results if r.themes_count > 0),
-            "citations_present": sum(1 for r in successful_results if r.has_citations),
-            "resource_cards_present": sum(1 for r in successful_results if r.has_resource_cards),
-            "avg_themes_count": statistics.mean([r.themes_count for r in successful_results]),
-            "avg_summary_length": statistics.mean([r.summary_length for r in successful_results]),
+            "themes_generated": themes_generated,
+            "citations_present": citations_present,
+            "resource_cards_present": resource_cards_present,
+            "avg_themes_count": total_themes / successful,
+            "avg_summary_length": total_summary_length / successful,
 
             # Error analysis
-            "errors": [r.error_message for r in failed_results if r.error_message]
+            "errors": [error for error in errors if error]
         }
 
         return analysis
@@ -240,6 +363,12 @@ class TherapyAssistantBenchmark:
         test_queries = self.get_test_queries()
         all_analyses = {}
 
+        # Warm up the server so one-time initialization is not timed. The
+        # query exercises the full pipeline but is not one of the test
+        # queries, so it cannot turn a measured request into a cache hit.
+        warmup = self.make_request(WARMUP_QUERY)
+        print(f"\n🔥 Warm-up request: {warmup.response_time:.2f}s (not counted)")
+
         # Test each category sequentially
         for category, queries in test_queries.items():
             print(f"\n📊 Testing Category: {category.upper()}")
@@ -255,14 +384,8 @@ class TherapyAssistantBenchmark:
         print(f"\n🔥 STRESS TEST: Concurrent Requests")
         print("-" * 40)
 
-        # Mix of different query types for realistic load
-        stress_queries = (
-            test_queries["trauma_related"][:3] +
-            test_queries["general_wellness"][:3] +
-            test_queries["non_trauma"][:2]
-        ) * 2  # Double for more load
-
-        concurrent_results = self.run_concurrent_test(stress_queries, max_workers=5)
+        max_workers = self._calibrate_workers()
+        concurrent_results = self.run_concurrent_test(STRESS_QUERIES, max_workers=max_workers)
         stress_analysis = self.analyze_results(concurrent_results, "stress_test_concurrent")
         all_analyses["stress_test"] = stress_analysis
 
@@ -281,6 +404,9 @@ class TherapyAssistantBenchmark:
         print(f"Success Rate: {analysis['success_rate']:.1f}%")
         print(f"Avg Response Time: {analysis['avg_response_time']:.2f}s")
         print(f"Response Time Range: {analysis['min_response_time']:.2f}s - {analysis['max_response_time']:.2f}s")
+        print(f"Response Time Percentiles: p50 {analysis['p50_response_time']:.2f}s | "
+              f"p90 {analysis['p90_response_time']:.2f}s | p95 {analysis['p95_response_time']:.2f}s | "
+              f"p99 {analysis['p99_response_time']:.2f}s")
 
         if analysis['avg_quality_score'] > 0:
             print(f"Avg Quality Score: {analysis['avg_quality_score']:.2f}")
@@ -299,8 +425,8 @@ class TherapyAssistantBenchmark:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"benchmark_results_{timestamp}.json"
 
-        with open(filename, 'w') as f:
-            json.dump(analyses, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(analyses, option=orjson.OPT_INDENT_2))
 
         print(f"\n💾 Detailed results saved to: {filename}")
 
@@ -310,21 +436,21 @@ class TherapyAssistantBenchmark:
         print("📈 BENCHMARK SUMMARY REPORT")
         print("=" * 60)
 
-        # Overall performance
-        all_response_times = []
-        all_success_rates = []
-
-        for name, analysis in analyses.items():
-            all_response_times.append(analysis['avg_response_time'])
-            all_success_rates.append(analysis['success_rate'])
+        # Per-category averages, read once into arrays
+        names = list(analyses)
+        response_times = np.fromiter((a['avg_response_time'] for a in analyses.values()),
+                                     dtype=np.float64, count=len(names))
+        success_rates = np.fromiter((a['success_rate'] for a in analyses.values()),
+                                    dtype=np.float64, count=len(names))
 
-        print(f"Overall Avg Response Time: {statistics.mean(all_response_times):.2f}s")
-        print(f"Overall Success Rate: {statistics.mean(all_success_rates):.1f}%")
+        # Overall performance
+        print(f"Overall Avg Response Time: {response_times.mean():.2f}s")
+        print(f"Overall Success Rate: {success_rates.mean():.1f}%")
 
         # Category breakdown
         print(f"\nPerformance by Category:")
-        for name, analysis in analyses.items():
-            print(f"  {name:25} | {analysis['avg_response_time']:6.2f}s | {analysis['success_rate']:5.1f}%")
+        for name, response_time, success_rate in zip(names, response_times, success_rates):
+            print(f"  {name:25} | {response_time:6.2f}s | {success_rate:5.1f}%")
 
         # Business rule compliance
         trauma_analysis = analyses.get('trauma_related_sequential', {})
@@ -339,10 +465,9 @@ def main():
     print("StrongAfter Therapy Assistant - Benchmark Testing")
     print("Ensure the backend server is running on http://localhost:5002")
 
-    # Check if server is accessible
+    # Check if server is accessible, without running the processing pipeline
     try:
-        response = requests.post("http://127.0.0.1:5002/api/process-text",
-                               json={"text": "test"}, timeout=10)
+        response = requests.get("http://127.0.0.1:5002/api/health", timeout=10)
         if response.status_code != 200:
             print("❌ Server health check failed")
             return
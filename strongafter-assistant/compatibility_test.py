@@ -4,30 +4,39 @@ Backward Compatibility Test for StrongAfter Therapy Assistant
 Tests both original and blackboard architectures side-by-side
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import time
 from datetime import datetime
 
-def test_service(base_url, service_name, query):
-    """Test a service and return structured results"""
+# Bytes of an error response body kept in error messages
+ERROR_BODY_LIMIT = 512
+
+def print_service_header(base_url, service_name, query):
+    """Print which service and query a result belongs to"""
     print(f"\n📡 Testing {service_name}")
     print(f"🔗 URL: {base_url}")
     print(f"📝 Query: {query}")
 
-    start_time = time.time()
+async def test_service(client, base_url, service_name, query):
+    """Test a service and return structured results"""
+    start_time = time.perf_counter()
 
     try:
-        response = requests.post(
+        response = await client.post(
             f"{base_url}/api/process-text",
             json={"text": query},
             timeout=30
         )
 
-        response_time = time.time() - start_time
+        response_time = time.perf_counter() - start_time
+
+        # Print once the response is in, so concurrent services don't interleave
+        print_service_header(base_url, service_name, query)
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
 
             result = {
                 'service': service_name,
@@ -36,11 +45,10 @@ def test_service(base_url, service_name, query):
                 'status_code': response.status_code,
                 'themes_count': len(data.get('themes', [])),
                 'summary_length': len(data.get('summary', '')),
-                'has_citations': bool(data.get('summary', '').count('⁽')),
+                'has_citations': '⁽' in data.get('summary', ''),
                 'has_book_metadata': len(data.get('book_metadata', {})) > 0,
                 'response_structure': list(data.keys()),
-                'sample_theme': data.get('themes', [{}])[0] if data.get('themes') else None,
-                'data': data  # Store full response for comparison
+                'sample_theme': data.get('themes', [{}])[0] if data.get('themes') else None
             }
 
             print(f"  ✅ Success: {response_time:.2f}s")
@@ -53,16 +61,18 @@ def test_service(base_url, service_name, query):
 
         else:
             print(f"  ❌ Failed: HTTP {response.status_code}")
+            body = response.content[:ERROR_BODY_LIMIT].decode('utf-8', errors='replace')
             return {
                 'service': service_name,
                 'success': False,
                 'response_time': response_time,
                 'status_code': response.status_code,
-                'error': f"HTTP {response.status_code}: {response.text}"
+                'error': f"HTTP {response.status_code}: {body}"
             }
 
     except Exception as e:
-        response_time = time.time() - start_time
+        response_time = time.perf_counter() - start_time
+        print_service_header(base_url, service_name, query)
         print(f"  ❌ Error: {e}")
         return {
             'service': service_name,
@@ -171,6 +181,38 @@ def print_compatibility_report(compatibility):
 
     print(f"\n⏱️ Performance Impact: {compatibility['performance_diff']:.2f}s")
 
+async def run_test_cases(services, test_cases):
+    """Run every test case, querying both services concurrently"""
+    all_results = []
+
+    async with httpx.AsyncClient() as client:
+        for i, query in enumerate(test_cases, 1):
+            print(f"\n{'='*70}")
+            print(f"🧪 TEST CASE {i}/{len(test_cases)}")
+            print(f"📝 Query: {query}")
+            print(f"{'='*70}")
+
+            # Test both services at once; they are independent
+            original_result, blackboard_result = await asyncio.gather(
+                test_service(client, services['Original'], 'Original', query),
+                test_service(client, services['Blackboard'], 'Blackboard', query)
+            )
+
+            # Compare compatibility
+            compatibility = compare_responses(original_result, blackboard_result)
+            print_compatibility_report(compatibility)
+
+            # Store results
+            test_result = {
+                'query': query,
+                'original': original_result,
+                'blackboard': blackboard_result,
+                'compatibility': compatibility
+            }
+            all_results.append(test_result)
+
+    return all_results
+
 def main():
     """Main compatibility testing function"""
     print("🔄 StrongAfter Therapy Assistant - Backward Compatibility Test")
@@ -191,32 +233,7 @@ def main():
         "I feel overwhelmed by anxiety from my past"
     ]
 
-    all_results = []
-
-    for i, query in enumerate(test_cases, 1):
-        print(f"\n{'='*70}")
-        print(f"🧪 TEST CASE {i}/{len(test_cases)}")
-        print(f"📝 Query: {query}")
-        print(f"{'='*70}")
-
-        # Test both services
-        original_result = test_service(services['Original'], 'Original', query)
-        blackboard_result = test_service(services['Blackboard'], 'Blackboard', query)
-
-        # Compare compatibility
-        compatibility = compare_responses(original_result, blackboard_result)
-        print_compatibility_report(compatibility)
-
-        # Store results
-        test_result = {
-            'query': query,
-            'original': original_result,
-            'blackboard': blackboard_result,
-            'compatibility': compatibility
-        }
-        all_results.append(test_result)
-
-        time.sleep(1)  # Brief pause between tests
+    all_results = asyncio.run(run_test_cases(services, test_cases))
 
     # Overall summary
     print(f"\n{'='*70}")
@@ -248,8 +265,8 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"compatibility_test_{timestamp}.json"
 
-    with open(filename, 'w') as f:
-        json.dump(all_results, f, indent=2, default=str)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(all_results, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
     print(f"\n💾 Detailed results saved to: {filename}")
     print("🎉 Compatibility testing completed!")